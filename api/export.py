@@ -0,0 +1,148 @@
+from datetime import datetime
+
+from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+
+from main_site.models import Bot, BotMeta
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """
+    Datetimes the way DRF renders them, full precision with a Z suffix.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            value = (timezone.localtime(o) if timezone.is_aware(o) else o).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+        return super().default(o)
+
+
+def field_names(model, exclude=()):
+    # Same order as ModelSerializer's "__all__": pk, plain fields, foreign keys
+    fields = [field for field in model._meta.concrete_fields if field.name not in exclude]
+    pk = [field for field in fields if field.primary_key]
+    plain = [field for field in fields if not field.primary_key and not field.is_relation]
+    relations = [field for field in fields if field.is_relation]
+    return [(field.name, field.attname) for field in pk + plain + relations]
+
+
+class BotExport:
+    """
+    Streams bots in BotAllSerializer's shape as a json array or as ndjson, fetched in chunks of
+    `chunk_size` with meta joined and tags/admins prefetched per chunk, so memory stays flat.
+    The heavy and internal columns (long_desc and its render, search_vector) are left out unless
+    asked for with ?fields=, eg: ?fields=id,name,meta.prefix,meta.long_desc
+    Pages with ?limit=<n>&after=<last id of the previous page>, a short page is the last one.
+    ?output=ndjson streams one object per line instead of an array.
+    """
+    chunk_size = 500
+    heavy_fields = {"search_vector", "meta.long_desc", "meta.long_desc_html", "meta.long_desc_hash"}
+
+    def __init__(self):
+        self.bot_fields = field_names(Bot, exclude=("id",))
+        self.meta_fields = field_names(BotMeta)
+        self.available = (
+            ["id", "meta"] + [name for name, _ in self.bot_fields] + ["tags", "admins"]
+            + [f"meta.{name}" for name, _ in self.meta_fields]
+        )
+
+    def selected(self, request):
+        requested = request.query_params.get("fields")
+        if not requested:
+            return [name for name in self.available if not name.startswith("meta.") and name not in self.heavy_fields]
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        if any(name not in self.available for name in names):
+            raise ValueError("Unknown field")
+        return names
+
+    def queryset(self, queryset, fields, after=None, limit=None):
+        wanted = set(fields)
+        meta = "meta" in wanted or any(name.startswith("meta.") for name in wanted)
+        queryset = queryset.order_by("id")
+        if meta:
+            queryset = queryset.select_related("meta")
+        deferred = [
+            name.replace(".", "__") for name in self.heavy_fields
+            if name not in wanted and (meta or not name.startswith("meta."))
+        ]
+        queryset = queryset.defer(*deferred)
+        queryset = queryset.prefetch_related(*[name for name in ("tags", "admins") if name in wanted])
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
+
+    def plan(self, fields):
+        """
+        (key, kind, attname) per output key in request order, and the meta fields to nest.
+        """
+        bot_fields = dict(self.bot_fields, id="id")
+        wanted = set(fields)
+        meta_fields = [
+            (name, attname) for name, attname in self.meta_fields
+            if f"meta.{name}" in wanted or ("meta" in wanted and f"meta.{name}" not in self.heavy_fields)
+        ]
+        plan = []
+        for name in fields:
+            if name == "meta" or name.startswith("meta."):
+                if ("meta", "meta", None) not in plan:
+                    plan.append(("meta", "meta", None))
+            elif name in ("tags", "admins"):
+                plan.append((name, "m2m", None))
+            else:
+                plan.append((name, "field", bot_fields[name]))
+        return plan, meta_fields
+
+    @staticmethod
+    def row(bot, plan, meta_fields):
+        data = {}
+        for key, kind, attname in plan:
+            if kind == "field":
+                data[key] = getattr(bot, attname)
+            elif kind == "m2m":
+                data[key] = [related.pk for related in getattr(bot, key).all()]
+            else:
+                # RelatedObjectDoesNotExist is an AttributeError, a missing meta renders as null like in DRF
+                meta = getattr(bot, "meta", None)
+                data[key] = None if meta is None else {name: getattr(meta, field) for name, field in meta_fields}
+        return data
+
+    def lines(self, queryset, fields, ndjson):
+        encoder = ExportEncoder()
+        plan, meta_fields = self.plan(fields)
+        if ndjson:
+            for bot in queryset.iterator(chunk_size=self.chunk_size):
+                yield encoder.encode(self.row(bot, plan, meta_fields)) + "\n"
+            return
+        yield "["
+        separator = ""
+        for bot in queryset.iterator(chunk_size=self.chunk_size):
+            yield separator + encoder.encode(self.row(bot, plan, meta_fields))
+            separator = ","
+        yield "]"
+
+    def response(self, request, queryset):
+        """
+        None when the query parameters are invalid.
+        """
+        try:
+            fields = self.selected(request)
+            after = request.query_params.get("after")
+            limit = request.query_params.get("limit")
+            after = int(after) if after else None
+            limit = int(limit) if limit else None
+            if limit is not None and limit <= 0:
+                raise ValueError("limit")
+        except ValueError:
+            return None
+        ndjson = request.query_params.get("output") == "ndjson"
+        return StreamingHttpResponse(
+            self.lines(self.queryset(queryset, fields, after, limit), fields, ndjson),
+            content_type="application/x-ndjson" if ndjson else "application/json",
+        )
+
+
+bot_export = BotExport()
@@ -1,10 +1,11 @@
 import pytz
 from datetime import datetime
+from django.db import transaction
 from django.contrib.auth.models import User
 
 from utils.mixins import ResponseMixin
 from utils.background import create_user
-from utils.api_client import DiscordAPIClient
+from utils.discord_users import DiscordUserUnavailable, discord_users
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -15,9 +16,6 @@ from main_site.models import Bot, BotTag, Member, Server
 from .serializers import BotStatusSerializer, ServerStatusSerializer
 
 
-discord_api = DiscordAPIClient()
-
-
 class UserMigrateView(APIView, ResponseMixin):
 
     def post(self, request):
@@ -45,12 +43,14 @@ class BotMigrateView(APIView, ResponseMixin):
             data = request.data
             if Bot.objects.filter(id=data.get("id")).exists():
                 return self.json_response_503()
-            resp = discord_api.get_bot_info(data.get("id"))
-            if resp.status_code == 404:
+            try:
+                resp = discord_users.get(data.get("id"))
+            except DiscordUserUnavailable:
+                return self.json_response_400()
+            if resp is None:
                 return self.json_response_503()
-            elif resp.status_code == 200:
-                resp = resp.json()
-                try:
+            try:
+                with transaction.atomic():
                     owner = Member.objects.get(id=data.get("owner_id"))
                     bot = Bot.objects.create(id=data.get("id"),
                                              name=resp.get("username"),
@@ -77,10 +77,9 @@ class BotMigrateView(APIView, ResponseMixin):
                     bot.meta.donate = data.get("donate")
                     bot.meta.long_desc = data.get("long_desc")
                     bot.meta.save()
-                except Member.DoesNotExist:
-                    return self.json_response_404()
-                return self.json_response_201()
-            return self.json_response_400()
+            except Member.DoesNotExist:
+                return self.json_response_404()
+            return self.json_response_201()
         return self.json_response_401()
 
 
@@ -90,6 +89,7 @@ class BotStatusEditView(APIView, ResponseMixin):
     """
     model = Bot
     serializer = BotStatusSerializer
+    statuses = ("VERIFIED", "REJECTED", "BANNED", "UNBANNED")
 
     def get(self, request, bot_id):
         if request.user.is_superuser:
@@ -102,36 +102,38 @@ class BotStatusEditView(APIView, ResponseMixin):
         if request.user.is_superuser:
             bot = get_object_or_404(self.model, id=bot_id)
             verification_status = request.data.get("verification_status")
-            moderator_id = request.data.get("moderator_id")
-            bot.meta.moderator = Member.objects.get(id=moderator_id)
-            bot.meta.save()
-            bot.verification_status = verification_status
-            if verification_status == "VERIFIED":
-                bot.verified = True
-                bot.save(update_fields=["verification_status", "verified"])
-            elif verification_status == "REJECTED":
-                bot.meta.rejection_count += 1
-                bot.meta.rejection_reason = request.data.get("reason")
+            if verification_status not in self.statuses:
+                return self.json_response_400()
+            # The moderator, status and meta writes and the notifications they queue commit together
+            with transaction.atomic():
+                moderator_id = request.data.get("moderator_id")
+                bot.meta.moderator = Member.objects.get(id=moderator_id)
                 bot.meta.save()
-                bot.save(update_fields=["verification_status"])
-                if bot.meta.rejection_count >= 3:
+                bot.verification_status = verification_status
+                if verification_status == "VERIFIED":
+                    bot.verified = True
+                    bot.save(update_fields=["verification_status", "verified"])
+                elif verification_status == "REJECTED":
+                    bot.meta.rejection_count += 1
+                    bot.meta.rejection_reason = request.data.get("reason")
+                    bot.meta.save()
+                    bot.save(update_fields=["verification_status"])
+                    if bot.meta.rejection_count >= 3:
+                        bot.banned = True
+                        bot.verified = False
+                        bot.meta.ban_reason = "Got rejected 3 times."
+                        bot.meta.save()
+                        bot.save(update_fields=["banned", "verified"])
+                elif verification_status == "BANNED":
                     bot.banned = True
                     bot.verified = False
-                    bot.meta.ban_reason = "Got rejected 3 times."
+                    bot.meta.ban_reason = request.data.get("reason")
                     bot.meta.save()
-                    bot.save(update_fields=["banned", "verified"])
-            elif verification_status == "BANNED":
-                bot.banned = True
-                bot.verified = False
-                bot.meta.ban_reason = request.data.get("reason")
-                bot.meta.save()
-                bot.save(update_fields=["banned"])
-            elif verification_status == "UNBANNED":
-                bot.banned = False
-                bot.verified = True
-                bot.save(update_fields=["banned", "verified", "verification_status"])
-            else:
-                return self.json_response_400()
+                    bot.save(update_fields=["banned"])
+                elif verification_status == "UNBANNED":
+                    bot.banned = False
+                    bot.verified = True
+                    bot.save(update_fields=["banned", "verified", "verification_status"])
             return self.json_response_200()
         return self.json_response_401()
 
@@ -142,6 +144,7 @@ class ServerStatusEditView(APIView, ResponseMixin):
     """
     model = Server
     serializer = ServerStatusSerializer
+    statuses = ("VERIFIED", "REJECTED", "BANNED", "UNBANNED")
 
     def get(self, request, server_id):
         if request.user.is_superuser:
@@ -154,35 +157,37 @@ class ServerStatusEditView(APIView, ResponseMixin):
         if request.user.is_superuser:
             server = get_object_or_404(self.model, id=server_id)
             verification_status = request.data.get("verification_status")
-            moderator_id = request.data.get("moderator_id")
-            server.meta.moderator = Member.objects.get(id=moderator_id)
-            server.meta.save()
-            server.verification_status = verification_status
-            if verification_status == "VERIFIED":
-                server.verified = True
-                server.save(update_fields=["verification_status", "verified"])
-            elif verification_status == "REJECTED":
-                server.meta.rejection_count += 1
-                server.meta.rejection_reason = request.data.get("reason")
+            if verification_status not in self.statuses:
+                return self.json_response_400()
+            # The moderator, status and meta writes and the notifications they queue commit together
+            with transaction.atomic():
+                moderator_id = request.data.get("moderator_id")
+                server.meta.moderator = Member.objects.get(id=moderator_id)
                 server.meta.save()
-                server.save(update_fields=["verification_status"])
-                if server.meta.rejection_count >= 3:
+                server.verification_status = verification_status
+                if verification_status == "VERIFIED":
+                    server.verified = True
+                    server.save(update_fields=["verification_status", "verified"])
+                elif verification_status == "REJECTED":
+                    server.meta.rejection_count += 1
+                    server.meta.rejection_reason = request.data.get("reason")
+                    server.meta.save()
+                    server.save(update_fields=["verification_status"])
+                    if server.meta.rejection_count >= 3:
+                        server.banned = True
+                        server.verified = False
+                        server.meta.ban_reason = "Got rejected 3 times."
+                        server.meta.save()
+                        server.save(update_fields=["banned", "verified"])
+                elif verification_status == "BANNED":
                     server.banned = True
                     server.verified = False
-                    server.meta.ban_reason = "Got rejected 3 times."
+                    server.meta.ban_reason = request.data.get("reason")
                     server.meta.save()
-                    server.save(update_fields=["banned", "verified"])
-            elif verification_status == "BANNED":
-                server.banned = True
-                server.verified = False
-                server.meta.ban_reason = request.data.get("reason")
-                server.meta.save()
-                server.save(update_fields=["banned"])
-            elif verification_status == "UNBANNED":
-                server.banned = False
-                server.verified = True
-                server.save(update_fields=["banned", "verified", "verification_status"])
-            else:
-                return self.json_response_400()
+                    server.save(update_fields=["banned"])
+                elif verification_status == "UNBANNED":
+                    server.banned = False
+                    server.verified = True
+                    server.save(update_fields=["banned", "verified", "verification_status"])
             return self.json_response_200()
         return self.json_response_401()
@@ -0,0 +1,30 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from .export import ExportEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    Drop-in for JSONRenderer: orjson when it is installed, otherwise the C json encoder with the
+    encoder fallback only consulted for non native types (datetimes, decimals, uuids, lazy strings).
+    Output stays compact and utf-8 like DRF's defaults, datetimes keep DRF's "Z" suffix.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is not None:
+            return orjson.dumps(data, default=ExportEncoder().default, option=orjson.OPT_UTC_Z)
+        return json.dumps(
+            data, default=ExportEncoder().default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
@@ -5,7 +5,10 @@ from main_site.models import Bot, BotMeta, Server, ServerMeta
 class BotMetaSerializer(serializers.ModelSerializer):
     class Meta:
         model = BotMeta
-        exclude = ("id", "bot", "long_desc", "moderator", "rejection_reason", "rejection_count", "ban_reason")
+        exclude = (
+            "id", "bot", "long_desc", "long_desc_html", "long_desc_hash", "moderator", "rejection_reason",
+            "rejection_count", "ban_reason"
+        )
 
 
 class BotSerializer(serializers.ModelSerializer):
@@ -63,3 +66,52 @@ class BotAllSerializer(serializers.ModelSerializer):
     class Meta:
         model = Bot
         fields = '__all__'
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for a ModelSerializer whose fields are plain model fields or serializers
+    nested one level deep. The field list is taken from the serializer once, objects are then built
+    straight from queryset.values() rows in the same shape, without per-object field introspection.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.nested = {}
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                # The related pk tells a missing row, rendered as null, from a row of nulls
+                self.nested[name] = f"{field.source}__pk"
+                self.columns += [
+                    ((name, sub), f"{field.source}__{sub_field.source}") for sub, sub_field in field.fields.items()
+                ]
+            else:
+                self.columns.append(((name,), field.source))
+        self.lookups = [lookup for _, lookup in self.columns] + list(self.nested.values())
+
+    def to_representation(self, row):
+        data = {}
+        for path, lookup in self.columns:
+            if len(path) == 1:
+                data[path[0]] = row[lookup]
+            elif row[self.nested[path[0]]] is None:
+                data[path[0]] = None
+            else:
+                data.setdefault(path[0], {})[path[1]] = row[lookup]
+        return data
+
+    def many(self, queryset):
+        return [self.to_representation(row) for row in queryset.values(*self.lookups)]
+
+    def get(self, **lookup):
+        """
+        The serialized object, None when it doesn't exist.
+        """
+        row = self.model.objects.filter(**lookup).values(*self.lookups).first()
+        return None if row is None else self.to_representation(row)
+
+
+bot_values = ValuesSerializer(BotSerializer)
+server_values = ValuesSerializer(ServerSerializer)
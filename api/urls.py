@@ -1,13 +1,18 @@
 from django.urls import path
-from .views import BotManageView, ServerManageView, BotAllView
+from .views import (BotManageView, BotStatsView, ServerManageView, BotAllView, AutocompleteView,
+                    BotStatSeriesView, ServerStatSeriesView)
 from .private_views import BotStatusEditView, ServerStatusEditView
 
 urlpatterns = [
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
     path('bots/all/', BotAllView.as_view(), name='bot_manage_dev_all'),
+    path('bots/stats/', BotStatsView.as_view(), name='bot_stats'),
+    path('bots/<str:pk>/stats/', BotStatSeriesView.as_view(), name='bot_stat_series'),
     path('bots/<str:bot_id>/', BotManageView.as_view(), name='bot_manage_alt'),
     path('bots/<str:bot_id>', BotManageView.as_view(), name='bot_manage'),
     path('bot/status/<int:bot_id>/', BotStatusEditView.as_view(), name='bot_status'),
     path('bots/', BotManageView.as_view(), name='bot_manage_dev'),
+    path('server/<str:pk>/stats/', ServerStatSeriesView.as_view(), name='server_stat_series'),
     path('server/<str:server_id>/', ServerManageView.as_view(), name='server_view_alt'),
     path('server/<str:server_id>', ServerManageView.as_view(), name='server_view'),
     path('server/status/<int:server_id>/', ServerStatusEditView.as_view(), name='server_status'),
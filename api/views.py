@@ -1,5 +1,8 @@
 
+from django.db.models import Q
 from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import NotFound
 from main_site.models import Bot, Server
 from utils.mixins import ResponseMixin
 from rest_framework.response import Response
@@ -7,7 +10,11 @@ from .serializers import BotSerializer
 from rest_framework.generics import get_object_or_404
 
 from utils.api_client import DiscordAPIClient
-from .serializers import ServerSerializer, BotAllSerializer
+from utils.autocomplete import bot_names, server_names
+from utils.stats import bot_stats
+from utils.timeseries import RESOLUTIONS, bot_series, server_series
+from .serializers import ServerSerializer, bot_values, server_values
+from .export import bot_export
 discord_api = DiscordAPIClient()
 
 
@@ -15,8 +22,8 @@ class BotAllView(APIView, ResponseMixin):
 
     def get(self, request):
         if request.user.is_superuser:
-            serializer = BotAllSerializer(Bot.objects.filter(verified=True), many=True)
-            return Response(serializer.data, status=200)
+            return bot_export.response(request, Bot.objects.filter(verified=True)) or self.json_response_400()
+        return self.json_response_401()
 
 
 class BotManageView(APIView, ResponseMixin):
@@ -31,12 +38,12 @@ class BotManageView(APIView, ResponseMixin):
 
     def get(self, request, bot_id=None):
         if not bot_id and request.user.is_superuser:
-            serializer = BotAllSerializer(Bot.objects.filter(
-                verification_status__in=["UNVERIFIED", "UNDER_REVIEW"]), many=True)
-            return Response(serializer.data, status=200)
-        queryset = get_object_or_404(Bot, id=bot_id)
-        serializer = self.serializers(queryset)
-        return Response(serializer.data, status=200)
+            queryset = Bot.objects.filter(verification_status__in=["UNVERIFIED", "UNDER_REVIEW"])
+            return bot_export.response(request, queryset) or self.json_response_400()
+        data = bot_values.get(id=bot_id) if bot_id and bot_id.isdigit() else None
+        if data is None:
+            raise NotFound()
+        return Response(data, status=200)
 
     def post(self, request, bot_id):
         queryset = get_object_or_404(Bot, id=bot_id)
@@ -63,6 +70,48 @@ class BotManageView(APIView, ResponseMixin):
         return self.json_response_403()
 
 
+class BotStatsView(APIView, ResponseMixin):
+
+    """
+        USE: For owners to post server counts of many shards and/or bots in one request
+        TYPE: POST
+        DATA [{"bot_id": int, "server_count": int, "shard_id": int, "shard_count": int}, ...]
+             shard_id and shard_count are optional, with a shard_id the server_count is that shard's
+    """
+
+    max_entries = 1000
+    # server_count and shard_count are integer columns
+    max_count = 2147483647
+
+    @classmethod
+    def clean(cls, entry):
+        stats = {"bot_id": int(entry["bot_id"])}
+        for field in ("server_count", "shard_id", "shard_count"):
+            value = entry.get(field)
+            stats[field] = None if value is None else int(value)
+            if stats[field] is not None and not 0 <= stats[field] <= cls.max_count:
+                raise ValueError(field)
+        shard_id, shard_count = stats["shard_id"], stats["shard_count"]
+        if shard_id is not None and (shard_count is None or shard_id >= shard_count):
+            raise ValueError("shard_id")
+        return stats
+
+    def post(self, request):
+        data = request.data.get("stats") if isinstance(request.data, dict) else request.data
+        if not isinstance(data, list) or not 0 < len(data) <= self.max_entries:
+            return self.json_response_400()
+        try:
+            stats = [self.clean(entry) for entry in data]
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return self.json_response_400()
+        bot_ids = {entry["bot_id"] for entry in stats}
+        owned = Bot.objects.filter(id__in=bot_ids, owner__user=request.user).values_list("id", flat=True)
+        if len(set(owned)) != len(bot_ids):
+            return self.json_response_403()
+        bot_stats.submit(stats)
+        return self.json_response_202()
+
+
 class ServerManageView(APIView, ResponseMixin):
 
     """
@@ -74,9 +123,10 @@ class ServerManageView(APIView, ResponseMixin):
     serializers = ServerSerializer
 
     def get(self, request, server_id):
-        queryset = get_object_or_404(Server, id=server_id)
-        serializer = self.serializers(queryset)
-        return Response(serializer.data, status=200)
+        data = server_values.get(id=server_id) if server_id.isdigit() else None
+        if data is None:
+            raise NotFound()
+        return Response(data, status=200)
 
     def put(self, request, server_id):
         queryset = get_object_or_404(Server, id=server_id)
@@ -90,3 +140,58 @@ class ServerManageView(APIView, ResponseMixin):
             return self.json_response_200()
         return self.json_response_401()
 
+
+
+class AutocompleteView(APIView):
+
+    """
+        USE: Search box typeahead, served from the in-process name index without touching the database
+        TYPE: GET
+        PARAMS ?q=<prefix>&type=bots|servers
+    """
+
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+    indexes = {"bots": bot_names, "servers": server_names}
+
+    def get(self, request):
+        index = self.indexes.get(request.query_params.get("type", "bots"), bot_names)
+        return Response({"results": index.complete(request.query_params.get("q", "")[:50])}, status=200)
+
+
+class BotStatSeriesView(APIView, ResponseMixin):
+
+    """
+        USE: Growth charts, one metric of one bot/server at one resolution in a single indexed read
+        TYPE: GET
+        PARAMS ?metric=<metric>&resolution=5m|1h|1d
+        DATA {"metric": str, "resolution": str, "points": [[unix_time, value], ...]}
+    """
+
+    permission_classes = (AllowAny,)
+    model = Bot
+    store = bot_series
+
+    def visible(self, request):
+        # Banned, unverified and unlisted listings only chart for their owner and staff
+        if request.user.is_staff:
+            return self.model.objects.all()
+        if request.user.is_authenticated:
+            return self.model.objects.filter(Q(is_listed=True) | Q(owner__user=request.user))
+        return self.model.objects.listed()
+
+    def get(self, request, pk):
+        metric = request.query_params.get("metric", next(iter(self.store.fields)))
+        resolution = request.query_params.get("resolution", "1h")
+        if metric not in self.store.fields or resolution not in RESOLUTIONS or not pk.isdigit():
+            return self.json_response_400()
+        if not self.visible(request).filter(id=int(pk)).exists():
+            return self.json_response_404()
+        return Response({
+            "metric": metric, "resolution": resolution, "points": self.store.series(int(pk), metric, resolution)
+        }, status=200)
+
+
+class ServerStatSeriesView(BotStatSeriesView):
+    model = Server
+    store = server_series
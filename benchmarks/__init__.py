@@ -0,0 +1,46 @@
+"""
+Ad hoc benchmarks, not part of the test suite. Run them from the repository root with the
+settings of the database to measure, eg: python -m benchmarks.trending
+Benchmarks that need rows create a throwaway test database next to the configured one.
+"""
+import os
+import timeit
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bladebotlist.settings")
+    django.setup()
+    # The signal receivers are only connected once the views import them
+    import utils.background  # noqa: F401
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    name = connection.settings_dict["NAME"]
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+        teardown_test_environment()
+
+
+def best(func, number=1, repeat=5):
+    """
+    Best time of `repeat` runs, per call, in milliseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label:<{width}}  {value}")
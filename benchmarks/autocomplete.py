@@ -0,0 +1,74 @@
+"""
+Build time, memory and lookup latency of the typeahead PrefixIndex on 100k synthetic names,
+and lookup latency while a reload runs on the background thread.
+"""
+import random
+import string
+import threading
+import time
+import tracemalloc
+
+from benchmarks import report, setup
+
+NAMES = 100_000
+LOOKUPS = 20_000
+
+
+def percentile(samples, fraction):
+    return sorted(samples)[int(len(samples) * fraction)]
+
+
+def lookups(index, prefixes):
+    samples = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.complete(prefix)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def main():
+    from main_site.models import Bot
+    from utils.autocomplete import PrefixIndex
+
+    alphabet = string.ascii_lowercase + " "
+    rows = [
+        (pk, "".join(random.choices(alphabet, k=random.randint(4, 20))).strip() or "x", random.randint(0, 5000))
+        for pk in range(NAMES)
+    ]
+
+    class Index(PrefixIndex):
+        def rows(self):
+            return iter(rows)
+
+    index = Index(Bot)
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.ensure_loaded()
+    build_ms = (time.perf_counter() - started) * 1000
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    prefixes = [name[:random.randint(1, 6)] for _, name, _ in random.choices(rows, k=LOOKUPS)]
+    warm = lookups(index, prefixes)
+
+    index.invalidate()
+    index.complete("a")
+    reloading = []
+    while index.reload_lock.locked():
+        reloading += lookups(index, random.sample(prefixes, 100))
+
+    report(f"PrefixIndex, {NAMES} names", [
+        ("build (first load, blocking)", f"{build_ms:.0f} ms"),
+        ("memory", f"{memory_mb:.1f} MB"),
+        ("lookup p50 / p99", f"{percentile(warm, 0.5):.1f} / {percentile(warm, 0.99):.1f} us"),
+        ("during reload, lookups", len(reloading)),
+        ("during reload, p50 / p99 / max", "{:.1f} / {:.1f} / {:.0f} us".format(
+            percentile(reloading, 0.5), percentile(reloading, 0.99), max(reloading)
+        )),
+    ])
+
+
+if __name__ == "__main__":
+    setup()
+    main()
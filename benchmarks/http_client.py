@@ -0,0 +1,96 @@
+"""
+DiscordHTTPClient against a local stub of the discord api: pooled connections vs a new connection
+per module level requests call, rate limit pacing, 429 retries and the circuit breaker.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import report, setup
+
+REQUESTS = 200
+
+
+class StubDiscord(BaseHTTPRequestHandler):
+    """
+    Answers every GET with {} and a rate limit bucket that resets after 0.5s, /users/ routes exhaust it on every
+    response, /ratelimited answers its first hit with a 429 and /down always answers 503.
+    Remembers the client addresses so the connections used can be counted.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = set()
+    hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).connections.add(self.client_address)
+        type(self).hits += 1
+        if self.path.endswith("/ratelimited") and self.hits == 1:
+            status, body = 429, json.dumps({"retry_after": 0.2}).encode()
+        elif self.path.endswith("/down"):
+            status, body = 503, b"{}"
+        else:
+            status, body = 200, b"{}"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Limit", "2")
+        self.send_header("X-RateLimit-Remaining", "0" if "/users/" in self.path else "1")
+        self.send_header("X-RateLimit-Reset-After", "0.5")
+        self.send_header("X-RateLimit-Bucket", "stub")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def timed(func):
+    StubDiscord.connections.clear()
+    started = time.perf_counter()
+    func()
+    return f"{time.perf_counter() - started:.3f} s, {len(StubDiscord.connections)} connections"
+
+
+def main():
+    import requests
+    from utils.http import CircuitOpen, DiscordHTTPClient
+
+    server = StubServer(("127.0.0.1", 0), StubDiscord)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/api/v8"
+
+    client = DiscordHTTPClient()
+    started = time.perf_counter()
+    status = client.get(base + "/ratelimited").status_code
+    retried = f"{status} after {time.perf_counter() - started:.2f} s"
+    paced = timed(lambda: [client.get(f"{base}/users/{1234567890123456 + i}") for i in range(6)])
+
+    for _ in range(5):
+        client.get(base + "/down")
+    try:
+        client.get(base + "/down")
+        breaker = "closed"
+    except CircuitOpen:
+        breaker = "open"
+
+    pooled = DiscordHTTPClient()
+    report(f"DiscordHTTPClient against a stub server, {REQUESTS} GETs", [
+        ("module level requests.get", timed(lambda: [requests.get(f"{base}/x") for _ in range(REQUESTS)])),
+        ("pooled client", timed(lambda: [pooled.get(f"{base}/x{i}") for i in range(REQUESTS)])),
+        ("raw pooled session", timed(lambda: [pooled.session.get(f"{base}/y") for _ in range(REQUESTS)])),
+        ("429 retried", retried),
+        ("6 GETs, bucket exhausted by each", paced),
+        ("breaker after 5 503s", breaker),
+    ])
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    setup()
+    main()
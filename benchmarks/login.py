@@ -0,0 +1,41 @@
+"""
+CPU time of authenticating a returning discord login: the old path derived a password from the discord id
+with utils.hashing and had ModelBackend verify it with the configured password hasher, DiscordIDBackend
+looks the user up by id. Use the production PASSWORD_HASHERS and ENCRYPTION_ITERATION, faster test hashers
+make the old path look cheap.
+"""
+import time
+
+from benchmarks import report, setup, test_database
+
+LOGINS = 10
+
+
+def cpu_ms(func):
+    started = time.process_time()
+    for _ in range(LOGINS):
+        user = func()
+    assert user is not None
+    return f"{(time.process_time() - started) / LOGINS * 1000:.1f} ms cpu per login"
+
+
+def main():
+    from django.contrib.auth import authenticate
+    from django.contrib.auth.models import User
+    from utils.hashing import Hasher
+
+    hasher = Hasher()
+    discord_id = "900000000000000001"
+    User.objects.create_user(username=discord_id, password=hasher.get_hashed_pass(discord_id))
+
+    report(f"authenticate(), returning member, {hasher.iterations} pbkdf2 iterations", [
+        ("before: pbkdf2 password + ModelBackend",
+         cpu_ms(lambda: authenticate(username=discord_id, password=hasher.get_hashed_pass(discord_id)))),
+        ("after: DiscordIDBackend", cpu_ms(lambda: authenticate(discord_id=discord_id))),
+    ])
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        main()
@@ -0,0 +1,82 @@
+"""
+Time to render bot_page.html for long descriptions of about 1, 10 and 100 KB: the stored html read
+through long_desc_rendered vs the | markdown filter parsing the description on every view (before).
+"""
+from benchmarks import best, report, setup, test_database
+
+SIZES = (1_000, 10_000, 100_000)
+
+SECTION = """
+## Features {index}
+
+The bot keeps **music queues**, _moderation logs_ and [dashboards](https://example.com/{index}) in sync.
+
+- play, pause and skip with `!play <song>`
+- per server prefixes and roles
+- 24/7 uptime
+
+```python
+await bot.queue.add(song, requester=ctx.author)
+```
+"""
+
+
+def description(size):
+    text, index = "# About\n", 0
+    while len(text) < size:
+        text += SECTION.format(index=index)
+        index += 1
+    return text
+
+
+def main():
+    from django.contrib.auth.models import User
+    from django.template import Context
+    from django.template.loader import get_template
+    from django.utils import timezone
+    from main_site.models import Bot, Member
+    from utils.rendering import render_markdown
+
+    user = User.objects.create_user(username="100000000000000000", password=None, first_name="owner")
+    owner = Member.objects.create(id=100000000000000000, user=user)
+    page = get_template("bot_page.html").template
+    source = page.source
+    # The page as it was: the description parsed by the | markdown filter on every view
+    before = page.engine.from_string(
+        source.replace("bot.meta.long_desc_rendered | safe", "bot.meta.long_desc | markdown | safe")
+    )
+    assert before.source != source
+
+    rows = []
+    for index, size in enumerate(SIZES):
+        bot = Bot.objects.create(
+            id=200000000000000000 + index, name=f"bot {index}", owner=owner, verified=True,
+            invite_link="https://discord.com/oauth2", short_desc="A bot", date_added=timezone.now()
+        )
+        bot.meta.long_desc = description(size)
+        bot.meta.save()
+        bot = Bot.objects.for_detail().get(id=bot.id)
+        context = Context({"bot": bot})
+
+        def parse_per_view():
+            # The old filter had no cache, every view parsed the markdown again
+            render_markdown.cache_clear()
+            return before.render(context)
+
+        def stored_html():
+            return page.render(context)
+
+        rows += [
+            (f"{size // 1000} KB, before: | markdown", f"{best(parse_per_view, number=5):.2f} ms"),
+            (f"{size // 1000} KB, after: long_desc_rendered", f"{best(stored_html, number=5):.2f} ms"),
+        ]
+    report("bot_page.html render time by description size", rows)
+
+
+if __name__ == "__main__":
+    setup()
+    # bladebotlist.urls doesn't import in this tree, the test urlconf names every route the page reverses
+    from django.test.utils import override_settings
+
+    with override_settings(ROOT_URLCONF="main_site.tests.urls"), test_database():
+        main()
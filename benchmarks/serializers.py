@@ -0,0 +1,66 @@
+"""
+Serialize and render time of the bot api reads: BotSerializer with DRF's JSONRenderer (before) vs
+ValuesSerializer with FastJSONRenderer (after), for one bot and for the full list.
+"""
+import random
+
+from benchmarks import best, report, setup, test_database
+
+BOTS = 3000
+
+
+def create_bots():
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from main_site.models import Bot, BotMeta, Member
+
+    user = User.objects.create_user(username="100000000000000000", password=None)
+    owner = Member.objects.create(id=100000000000000000, user=user)
+    now = timezone.now()
+    bots = Bot.objects.bulk_create(
+        Bot(
+            id=200000000000000000 + i, name=f"bot {i}", owner=owner, invite_link="https://discord.com/oauth2",
+            short_desc="A bot", date_added=now, votes=random.randint(0, 5000), verified=True
+        )
+        for i in range(BOTS)
+    )
+    BotMeta.objects.bulk_create(
+        BotMeta(bot=bot, prefix="!", library="discord.py", website="https://example.com") for bot in bots
+    )
+    return bots[0].id
+
+
+def main():
+    from rest_framework.renderers import JSONRenderer
+    from api.renderers import FastJSONRenderer
+    from api.serializers import BotSerializer, bot_values
+    from main_site.models import Bot
+
+    bot_id = create_bots()
+    queryset = Bot.objects.all()
+
+    def drf_one():
+        return JSONRenderer().render(BotSerializer(Bot.objects.select_related("meta").get(id=bot_id)).data)
+
+    def fast_one():
+        return FastJSONRenderer().render(bot_values.get(id=bot_id))
+
+    def drf_many():
+        return JSONRenderer().render(BotSerializer(queryset.select_related("meta"), many=True).data)
+
+    def fast_many():
+        return FastJSONRenderer().render(bot_values.many(queryset))
+
+    assert drf_one() == fast_one() and drf_many() == fast_many()
+    report(f"bot reads, query + serialize + render, {BOTS} bots", [
+        ("one, before: BotSerializer + JSONRenderer", f"{best(drf_one, number=200):.2f} ms"),
+        ("one, after: bot_values + FastJSONRenderer", f"{best(fast_one, number=200):.2f} ms"),
+        ("list, before: BotSerializer + JSONRenderer", f"{best(drf_many):.0f} ms"),
+        ("list, after: bot_values + FastJSONRenderer", f"{best(fast_many):.0f} ms"),
+    ])
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        main()
@@ -0,0 +1,63 @@
+"""
+Trending scores kept by the per-vote UPDATE against a full rebuild from the vote ledger:
+cost of each, and how far the incremental scores drift from the rebuilt ones.
+"""
+import random
+import time
+from datetime import timedelta
+
+from benchmarks import best, report, setup, test_database
+
+BOTS = 1000
+VOTES = 20000
+DAYS = 30
+
+
+def main():
+    from django.db import transaction
+    from django.utils import timezone
+
+    from main_site.models import Bot, BotVote
+    from main_site.tests.factories import make_bot, make_member
+    from utils import trending
+    from utils.votes import bot_votes
+
+    owner, voter = make_member(), make_member()
+    bots = [make_bot(owner, verified=True).id for _ in range(BOTS)]
+    now = timezone.now()
+    votes = sorted(
+        (now - timedelta(seconds=random.uniform(0, DAYS * 86400)), random.choice(bots)) for _ in range(VOTES)
+    )
+    BotVote.objects.bulk_create(
+        [BotVote(member=voter, bot_id=pk, creation_time=when) for when, pk in votes], batch_size=2000
+    )
+
+    # The UPDATE VoteLedger.cast runs for every vote, replayed in vote order
+    started = time.perf_counter()
+    with transaction.atomic():
+        for when, pk in votes:
+            Bot.objects.filter(id=pk).update(trending=trending.add_vote(when))
+    incremental_ms = (time.perf_counter() - started) * 1000
+    incremental = dict(Bot.objects.values_list("id", "trending"))
+
+    rebuild_ms = best(bot_votes.rebuild_trending, repeat=3)
+    rebuilt = dict(Bot.objects.values_list("id", "trending"))
+    drift = max(abs(incremental[pk] - rebuilt[pk]) for pk in bots)
+    top = 100
+    same_top = (
+        sorted(bots, key=lambda pk: -incremental[pk])[:top] == sorted(bots, key=lambda pk: -rebuilt[pk])[:top]
+    )
+
+    report(f"{VOTES} votes on {BOTS} bots over {DAYS} days", [
+        ("incremental, per vote", f"{incremental_ms / VOTES:.3f} ms"),
+        ("incremental, all votes", f"{incremental_ms:.0f} ms"),
+        ("ledger rebuild", f"{rebuild_ms:.0f} ms"),
+        ("max |incremental - rebuild|", f"{drift:.2e} (log space)"),
+        (f"same top {top} order", same_top),
+    ])
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        main()
@@ -85,6 +85,27 @@ DATABASES = {
     )
 }
 
+# --- CACHE CONFIGURATION ---
+# Local memory by default, set CACHE_URL (eg: redis://127.0.0.1:6379/0) to share it between workers
+CACHE_URL = config('CACHE_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', cast=int, default=300)
+
+# Discord logins resolve users by id, ModelBackend stays for password logins to the admin
+AUTHENTICATION_BACKENDS = [
+    'main_site.backends.DiscordIDBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -96,7 +117,7 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAuthenticated',),
     'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework.authentication.TokenAuthentication',),
-    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',)
+    'DEFAULT_RENDERER_CLASSES': ('api.renderers.FastJSONRenderer',)
 }
 
 # Internationalization
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
-    Member, Bot, BotMeta, BotTag, MemberMeta, BotVote, BotReport,
-    Server, ServerVote, ServerTag, ServerReport, ServerMeta
+    Member, Bot, BotMeta, BotTag, MemberMeta, BotVote, BotVoteDaily, BotReport,
+    Server, ServerVote, ServerVoteDaily, ServerTag, ServerReport, ServerMeta, OutboxMessage
 )
 
 
@@ -16,9 +16,12 @@ admin.site.register(BotMeta)
 admin.site.register(BotTag)
 admin.site.register(MemberMeta)
 admin.site.register(BotVote)
+admin.site.register(BotVoteDaily)
 admin.site.register(BotReport)
 admin.site.register(Server)
 admin.site.register(ServerTag)
 admin.site.register(ServerReport)
 admin.site.register(ServerVote)
+admin.site.register(ServerVoteDaily)
 admin.site.register(ServerMeta)
+admin.site.register(OutboxMessage)
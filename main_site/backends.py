@@ -0,0 +1,18 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.backends import ModelBackend
+
+
+class DiscordIDBackend(ModelBackend):
+    """
+    Logs in the user of a discord id that OAuth has already verified, usernames are discord ids.
+    Nothing is hashed, the password of these accounts never proves anything.
+    """
+
+    def authenticate(self, request, discord_id=None, **kwargs):
+        if discord_id is None:
+            return None
+        try:
+            user = User.objects.select_related("member").get(username=str(discord_id))
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
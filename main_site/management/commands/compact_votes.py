@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from utils.votes import bot_votes, server_votes
+
+
+class Command(BaseCommand):
+    help = 'Folds raw bot/server votes older than N days into the daily rollup tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # The vote cooldown reads the raw ledger, never compact inside it.
+        before = timezone.now() - timedelta(days=max(options['days'], 1))
+        for name, ledger in (("bot", bot_votes), ("server", server_votes)):
+            total = 0
+            while True:
+                compacted = ledger.compact_batch(before, options['batch_size'])
+                if not compacted:
+                    break
+                total += compacted
+            self.stdout.write(f"Compacted {total} {name} votes older than {before:%Y-%m-%d}.")
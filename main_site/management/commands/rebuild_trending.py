@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from utils.votes import bot_votes, server_votes
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the trending scores of bots and servers from the vote ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for name, ledger in (("bot", bot_votes), ("server", server_votes)):
+            total = ledger.rebuild_trending(options['batch_size'])
+            self.stdout.write(f"Rebuilt trending scores of {total} {name}s.")
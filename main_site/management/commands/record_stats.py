@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from utils.timeseries import bot_series, server_series
+
+
+class Command(BaseCommand):
+    help = 'Samples bot/server counts into their time series, run it from the scheduler every 5 minutes'
+
+    def handle(self, *args, **options):
+        for name, store in (("bot", bot_series), ("server", server_series)):
+            self.stdout.write(f"Wrote {store.snapshot()} {name} series.")
@@ -0,0 +1,34 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from main_site.models import Bot
+from utils.async_api_client import AsyncDiscordAPIClient
+
+
+class Command(BaseCommand):
+    help = 'Refreshes the name and avatar of every bot from discord, fetching them concurrently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    async def fetch(self, bot_ids, concurrency):
+        async with AsyncDiscordAPIClient(concurrency=concurrency) as client:
+            return await client.fan_out(client.get_bot_info, bot_ids)
+
+    def handle(self, *args, **options):
+        bots = Bot.objects.in_bulk()
+        responses = asyncio.run(self.fetch(list(bots), options['concurrency']))
+        updated = failed = 0
+        for bot_id, resp in responses.items():
+            if isinstance(resp, Exception) or resp.status_code != 200:
+                failed += 1
+                continue
+            data = resp.json()
+            bot = bots[bot_id]
+            name, avatar = data.get("username", bot.name), data.get("avatar")
+            if (bot.name, bot.avatar) != (name, avatar):
+                bot.name, bot.avatar = name, avatar
+                bot.save(update_fields=["name", "avatar"])
+                updated += 1
+        self.stdout.write(f"Refreshed {len(responses)} bots, {updated} changed, {failed} failed.")
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from utils import tokens
+
+
+class Command(BaseCommand):
+    help = 'Refreshes member OAuth tokens before they expire, run it from the scheduler every few hours'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Refresh tokens expiring within this many hours')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        within = timedelta(hours=options['hours'])
+        refreshed, failed = 0, set()
+        while True:
+            count, failed_ids = tokens.refresh_expiring(
+                within, options['batch_size'], options['concurrency'], exclude=failed
+            )
+            # Failed members stay inside the window, leave them out of the later batches of this run
+            refreshed += count
+            failed.update(failed_ids)
+            if count + len(failed_ids) < options['batch_size']:
+                break
+        self.stdout.write(f"Refreshed {refreshed} tokens, {len(failed)} failed.")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from utils.facets import bot_facets, server_facets
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the listed counts and top lists stored on bot and server tags'
+
+    def handle(self, *args, **options):
+        bot_facets.refresh_all()
+        server_facets.refresh_all()
+        self.stdout.write("Tag facets refreshed.")
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils import outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued discord DMs and log channel embeds from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the due messages and exit')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.drain(options['batch_size'], options['concurrency'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} notifications, {failed} failed.")
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['interval'])
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from utils.discord_users import discord_users
+
+
+class Command(BaseCommand):
+    help = 'Prefetches discord users into the cache before a bulk bot migration'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int)
+        parser.add_argument('--file', help='File with one discord id per line')
+
+    def handle(self, *args, **options):
+        user_ids = list(options['ids'])
+        if options['file']:
+            with open(options['file']) as file:
+                user_ids += [int(line) for line in file if line.strip()]
+        users = discord_users.get_many(user_ids)
+        found = sum(user is not None for user in users.values())
+        self.stdout.write(f"Cached {found} users, {len(users) - found} unknown, {len(user_ids) - len(users)} failed.")
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+
+def backfill_is_listed(apps, schema_editor):
+    for model_name in ("Bot", "Server"):
+        model = apps.get_model("main_site", model_name)
+        model.objects.filter(verified=True, banned=False, owner__banned=False).update(is_listed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0025_alter_botmeta_prefix'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot',
+            name='is_listed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='server',
+            name='is_listed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_is_listed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='bot',
+            index=models.Index(fields=['is_listed', '-votes'], name='bot_listed_votes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bot',
+            index=models.Index(fields=['is_listed', '-date_added'], name='bot_listed_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='server',
+            index=models.Index(fields=['is_listed', '-votes'], name='server_listed_votes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='server',
+            index=models.Index(fields=['is_listed', '-date_added'], name='server_listed_date_idx'),
+        ),
+    ]
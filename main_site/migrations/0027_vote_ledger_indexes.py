@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:59
+
+from django.db import migrations, models
+import main_site.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0026_listing_flag'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='botvote',
+            name='id',
+            field=models.UUIDField(default=main_site.models.time_ordered_uuid, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='servervote',
+            name='id',
+            field=models.UUIDField(default=main_site.models.time_ordered_uuid, primary_key=True, serialize=False),
+        ),
+        migrations.AddIndex(
+            model_name='botvote',
+            index=models.Index(fields=['member', 'bot', 'creation_time'], name='botvote_member_bot_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servervote',
+            index=models.Index(fields=['member', 'server', 'creation_time'], name='servervote_member_srv_time_idx'),
+        ),
+    ]
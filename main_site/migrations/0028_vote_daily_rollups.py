@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0027_vote_ledger_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotVoteDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('votes', models.IntegerField(default=0)),
+                ('bot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_votes', to='main_site.bot')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ServerVoteDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('votes', models.IntegerField(default=0)),
+                ('server', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_votes', to='main_site.server')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'server'], name='servervotedaily_day_server_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='servervotedaily',
+            constraint=models.UniqueConstraint(fields=('server', 'day'), name='servervotedaily_server_day_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='botvotedaily',
+            index=models.Index(fields=['day', 'bot'], name='botvotedaily_day_bot_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='botvotedaily',
+            constraint=models.UniqueConstraint(fields=('bot', 'day'), name='botvotedaily_bot_day_unique'),
+        ),
+    ]
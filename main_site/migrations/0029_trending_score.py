@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0028_vote_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot',
+            name='trending',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='server',
+            name='trending',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='bot',
+            index=models.Index(fields=['is_listed', '-trending'], name='bot_listed_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='server',
+            index=models.Index(fields=['is_listed', '-trending'], name='server_listed_trending_idx'),
+        ),
+    ]
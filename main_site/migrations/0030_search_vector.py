@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# GIN indexes only exist on postgres, other databases fall back to the in-process index in utils/search.py
+SEARCH_INDEXES = (("main_site_bot", "bot_search_vector_gin"), ("main_site_server", "server_search_vector_gin"))
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, name in SEARCH_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (search_vector)")
+    for model_name, meta_table, fk in (("bot", "main_site_botmeta", "bot_id"),
+                                       ("server", "main_site_servermeta", "server_id")):
+        schema_editor.execute(
+            f"UPDATE main_site_{model_name} AS t SET search_vector = "
+            f"setweight(to_tsvector('english', coalesce(t.name, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce(t.short_desc, '')), 'B') || "
+            f"setweight(to_tsvector('english', coalesce(m.long_desc, '')), 'C') "
+            f"FROM {meta_table} AS m WHERE m.{fk} = t.id"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, name in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0029_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bot',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='server',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
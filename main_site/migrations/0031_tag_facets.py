@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0030_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bottag',
+            name='listed_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bottag',
+            name='top_trending',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='bottag',
+            name='top_voted',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='bottag',
+            name='trending_floor',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bottag',
+            name='votes_floor',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='servertag',
+            name='listed_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='servertag',
+            name='top_trending',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='servertag',
+            name='top_voted',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='servertag',
+            name='trending_floor',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='servertag',
+            name='votes_floor',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
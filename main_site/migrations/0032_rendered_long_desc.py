@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:04
+
+from django.db import migrations, models
+
+from utils.rendering import content_hash, render_markdown
+
+
+def render_long_descs(apps, schema_editor):
+    for model_name in ("BotMeta", "ServerMeta"):
+        model = apps.get_model("main_site", model_name)
+        for meta in model.objects.exclude(long_desc__isnull=True).only("id", "long_desc").iterator():
+            model.objects.filter(id=meta.id).update(
+                long_desc_html=render_markdown(meta.long_desc), long_desc_hash=content_hash(meta.long_desc)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0031_tag_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='botmeta',
+            name='long_desc_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='botmeta',
+            name='long_desc_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='servermeta',
+            name='long_desc_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='servermeta',
+            name='long_desc_html',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(render_long_descs, migrations.RunPython.noop),
+    ]
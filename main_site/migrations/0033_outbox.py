@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.utils.timezone
+import main_site.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0032_rendered_long_desc'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(default=main_site.models.time_ordered_nonce, max_length=25, unique=True)),
+                ('kind', models.CharField(choices=[('DM', 'Direct Message'), ('EMBED', 'Channel Embed')], max_length=10)),
+                ('recipient_id', models.BigIntegerField()),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('creation_time', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0033_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membermeta',
+            name='admin_servers_updated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
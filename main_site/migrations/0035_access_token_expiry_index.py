@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0034_admin_servers_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='membermeta',
+            name='access_token_expiry',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
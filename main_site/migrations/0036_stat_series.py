@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0035_access_token_expiry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.CharField(choices=[('bot', 'Bot'), ('server', 'Server')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('metric', models.CharField(max_length=20)),
+                ('resolution', models.CharField(max_length=5)),
+                ('last_bucket', models.BigIntegerField()),
+                ('values', models.BinaryField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statseries',
+            constraint=models.UniqueConstraint(fields=('content', 'object_id', 'metric', 'resolution'), name='stat_series_unique'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from utils.rendering import content_hash, render_markdown
+
+
+def rerender_long_descs(apps, schema_editor):
+    # Renders stored before RENDERER_VERSION 2 can hold entity encoded javascript: links
+    for model_name in ("BotMeta", "ServerMeta"):
+        model = apps.get_model("main_site", model_name)
+        for meta in model.objects.exclude(long_desc__isnull=True).only("id", "long_desc").iterator():
+            model.objects.filter(id=meta.id).update(
+                long_desc_html=render_markdown(meta.long_desc), long_desc_hash=content_hash(meta.long_desc)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0036_stat_series'),
+    ]
+
+    operations = [
+        migrations.RunPython(rerender_long_descs, migrations.RunPython.noop),
+    ]
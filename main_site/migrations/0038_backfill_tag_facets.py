@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# TagFacets.size
+FACET_SIZE = 40
+
+
+def backfill_tag_facets(apps, schema_editor):
+    for tag_model_name, relation in (("BotTag", "bots"), ("ServerTag", "attached_servers")):
+        tag_model = apps.get_model("main_site", tag_model_name)
+        for tag in tag_model.objects.all():
+            listed = getattr(tag, relation).filter(is_listed=True)
+            top_voted = list(listed.order_by("-votes", "-id").values_list("id", "votes")[:FACET_SIZE])
+            top_trending = list(listed.order_by("-trending", "-id").values_list("id", "trending")[:FACET_SIZE])
+            tag.listed_count = listed.count()
+            tag.top_voted = [pk for pk, _ in top_voted]
+            tag.top_trending = [pk for pk, _ in top_trending]
+            tag.votes_floor = top_voted[-1][1] if len(top_voted) == FACET_SIZE else None
+            tag.trending_floor = top_trending[-1][1] if len(top_trending) == FACET_SIZE else None
+            tag.save(update_fields=["listed_count", "top_voted", "top_trending", "votes_floor", "trending_floor"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0037_rerender_long_desc'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tag_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_site', '0038_backfill_tag_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BotShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard_id', models.IntegerField()),
+                ('server_count', models.IntegerField()),
+                ('updated', models.DateTimeField()),
+                ('bot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='main_site.bot')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='botshard',
+            constraint=models.UniqueConstraint(fields=('bot', 'shard_id'), name='botshard_bot_shard_unique'),
+        ),
+    ]
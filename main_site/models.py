@@ -1,16 +1,41 @@
+import os
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
 from django.db import models
+from django.utils.timezone import now
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
 from utils.oauth import Oauth
 from utils.embedhandler import EmbedHandler
 from utils.api_client import DiscordAPIClient
+from utils.rendering import content_hash, render_markdown
 from rest_framework.authtoken.models import Token
 
 oauth = Oauth()
 embed_handler = EmbedHandler()
 api_client = DiscordAPIClient()
 
+ADMIN_SERVERS_TTL = timedelta(minutes=10)
+
+
+def time_ordered_uuid():
+    """
+    UUIDv7 layout, 48 bit unix millisecond timestamp followed by random bits.
+    New rows land at the end of the primary key index instead of a random page.
+    """
+    value = (int(time.time() * 1000) << 80) | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def time_ordered_nonce():
+    """
+    Discord message nonces are capped at 25 characters.
+    """
+    return time_ordered_uuid().hex[:25]
+
 
 class Member(models.Model):
     id = models.BigIntegerField(primary_key=True)
@@ -21,6 +46,31 @@ class Member(models.Model):
     ban_reason = models.TextField(null=True, blank=True)
     dm_channel = models.BigIntegerField(null=True, blank=True)
 
+    # What the listings and the bot pages show of the owner, remembered like ListingStateMixin does
+    profile_fields = ("banned", "avatar", "tag")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_profile_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_profile_state()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.remember_profile_state()
+
+    def profile_state(self):
+        if any(field not in self.__dict__ for field in self.profile_fields):
+            return None
+        return tuple(self.__dict__[field] for field in self.profile_fields)
+
+    def remember_profile_state(self):
+        self.saved_profile_state = self.profile_state()
+
     @property
     def has_bots(self):
         return self.bots.first()
@@ -39,6 +89,15 @@ class Member(models.Model):
     def verified_bots(self):
         return self.bots.filter(verified=True)
 
+    def sync_listings(self):
+        if self.banned:
+            bots = self.bots.filter(is_listed=True).update(is_listed=False)
+            servers = self.servers.filter(is_listed=True).update(is_listed=False)
+        else:
+            bots = self.bots.filter(verified=True, banned=False, is_listed=False).update(is_listed=True)
+            servers = self.servers.filter(verified=True, banned=False, is_listed=False).update(is_listed=True)
+        return bots, servers
+
     def send_message(self, message):
         if not self.dm_channel:
             channel_id = api_client.create_dm_channel(self.id)
@@ -64,41 +123,67 @@ class Member(models.Model):
         return f"https://bladelist.gg/users/{self.id}"
 
     def refresh_access_token(self):
+        """
+        Returns False when discord didn't hand out a new token, a revoked grant also clears the
+        stored tokens so the member is skipped until the next login.
+        """
         token_json = oauth.refresh_access_token(self.meta.refresh_token)
+        if "access_token" not in token_json:
+            if token_json.get("error") == "invalid_grant":
+                self.meta.access_token = self.meta.refresh_token = self.meta.access_token_expiry = None
+                self.meta.save(update_fields=["access_token", "refresh_token", "access_token_expiry"])
+            return False
         self.meta.access_token = token_json.get("access_token")
         self.meta.refresh_token = token_json.get("refresh_token")
         self.meta.access_token_expiry = \
             datetime.now(timezone.utc) + timedelta(seconds=int(token_json.get("expires_in")))
-        self.meta.save()
-
-    def refresh_admin_servers(self):
-        if self.meta.access_token:
-            if self.meta.access_token_expiry > datetime.now(timezone.utc):
-                self.refresh_access_token()
-            admin_servers = [
-                guild for guild in oauth.get_guild_info_json(self.meta.access_token) if int(guild.get("permissions")) & 8
-                ]
-            self.meta.admin_servers = admin_servers
-            self.meta.save()
-            return admin_servers
-        return
+        self.meta.save(update_fields=["access_token", "refresh_token", "access_token_expiry"])
+        return True
+
+    def refresh_admin_servers(self, force=False):
+        """
+        Guilds the member administrates, served from MemberMeta for ADMIN_SERVERS_TTL after each fetch.
+        """
+        meta = self.meta
+        if not meta.access_token:
+            return []
+        fetched = meta.admin_servers_updated
+        if not force and meta.admin_servers is not None and fetched and now() - fetched < ADMIN_SERVERS_TTL:
+            return meta.admin_servers
+        if meta.access_token_expiry is not None and meta.access_token_expiry <= now():
+            # Tokens are renewed by the refresh_oauth_tokens job, never on a request
+            return meta.admin_servers or []
+        meta.admin_servers = [
+            guild for guild in oauth.get_guild_info_json(meta.access_token) if int(guild.get("permissions")) & 8
+        ]
+        meta.admin_servers_updated = now()
+        meta.save(update_fields=["admin_servers", "admin_servers_updated"])
+        return meta.admin_servers
 
     def get_admin_server_data(self, server_id):
         for server in self.meta.admin_servers:
             if server.get("id") == server_id:
                 return server
 
-    def sync_servers(self):
-        for server in self.refresh_admin_servers():
-            try:
-                server_obj = Server.objects.get(id=server["id"])
-                if self not in server_obj.admins.all():
-                    server_obj.admins.add(self)
-                if server["owner"] and server_obj.owner != self:
-                    server_obj.owner = self
-                    server_obj.save()
-            except Server.DoesNotExist:
-                pass
+    def sync_servers(self, force=False):
+        """
+        Adds the member to the admins of every listed server they administrate on discord and
+        hands over ownership of the ones they own, in two queries however many guilds they have.
+        """
+        guilds = {int(guild["id"]): guild for guild in self.refresh_admin_servers(force=force)}
+        servers = dict(Server.objects.filter(id__in=guilds).values_list("id", "owner_id"))
+        if not servers:
+            return
+        through = Server.admins.through
+        admin_of = set(through.objects.filter(member=self, server_id__in=servers).values_list("server_id", flat=True))
+        through.objects.bulk_create(
+            [through(server_id=pk, member_id=self.id) for pk in servers if pk not in admin_of], ignore_conflicts=True
+        )
+        for pk, owner_id in servers.items():
+            if guilds[pk].get("owner") and owner_id != self.id:
+                server = Server.objects.get(id=pk)
+                server.owner = self
+                server.save()
 
 
 class MemberMeta(models.Model):
@@ -112,21 +197,101 @@ class MemberMeta(models.Model):
     reddit = models.URLField(null=True, blank=True)
     access_token = models.CharField(max_length=32, null=True, blank=True)
     refresh_token = models.CharField(max_length=32, null=True, blank=True)
-    access_token_expiry = models.DateTimeField(null=True, blank=True)
+    access_token_expiry = models.DateTimeField(null=True, blank=True, db_index=True)
     admin_servers = models.JSONField(null=True, blank=True)
+    admin_servers_updated = models.DateTimeField(null=True, blank=True)
+
+
+class RenderedLongDescMixin:
+    """
+    Stores the sanitized html of long_desc next to the hash of the markdown it was rendered from,
+    so detail pages never parse markdown unless the column was edited behind our back.
+    """
+
+    def save(self, *args, **kwargs):
+        digest = content_hash(self.long_desc)
+        if digest != self.long_desc_hash:
+            self.long_desc_html = render_markdown(self.long_desc)
+            self.long_desc_hash = digest
+        if kwargs.get("update_fields") is not None and "long_desc" in kwargs["update_fields"]:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "long_desc_html", "long_desc_hash"}
+        super().save(*args, **kwargs)
+
+    @property
+    def long_desc_rendered(self):
+        if self.long_desc_hash == content_hash(self.long_desc):
+            return self.long_desc_html
+        return render_markdown(self.long_desc)
+
+
+class ListingStateMixin:
+    """
+    Remembers is_listed, votes and trending as they were loaded or last saved, so the save
+    receivers can tell what a save changed without reading the row again.
+    Saves without update_fields leave the vote columns alone.
+    saved_listing_state is None when unknown, eg: on instances loaded with those fields deferred.
+    """
+    listing_fields = ("is_listed", "votes", "trending")
+    vote_fields = ("votes", "trending")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_listing_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_listing_state()
+
+    def listing_state(self):
+        if any(field not in self.__dict__ for field in self.listing_fields):
+            return None
+        return tuple(self.__dict__[field] for field in self.listing_fields)
+
+    def remember_listing_state(self):
+        self.saved_listing_state = self.listing_state()
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # votes and trending are only written by VoteLedger's F() updates, a plain save() would put
+        # back the values loaded before a concurrent vote. Naming them in update_fields still writes them.
+        if update_fields is None:
+            values = [value for value in values if value[0].name not in self.vote_fields]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
+
+class ListingQuerySet(models.QuerySet):
+    def listed(self):
+        return self.filter(is_listed=True)
+
+    def for_cards(self):
+        return self.prefetch_related("tags")
+
+    def for_detail(self):
+        return self.select_related("owner__user", "meta__moderator__user").prefetch_related("tags")
 
 
 class BotTag(models.Model):
     name = models.CharField(max_length=15, primary_key=True)
     icon = models.CharField(max_length=25)
+    listed_count = models.IntegerField(default=0)
+    top_voted = models.JSONField(default=list, blank=True)
+    top_trending = models.JSONField(default=list, blank=True)
+    votes_floor = models.IntegerField(null=True, blank=True)
+    trending_floor = models.FloatField(null=True, blank=True)
 
 
 class ServerTag(models.Model):
     name = models.CharField(max_length=25, primary_key=True)
     icon = models.CharField(max_length=30)
+    listed_count = models.IntegerField(default=0)
+    top_voted = models.JSONField(default=list, blank=True)
+    top_trending = models.JSONField(default=list, blank=True)
+    votes_floor = models.IntegerField(null=True, blank=True)
+    trending_floor = models.FloatField(null=True, blank=True)
 
 
-class Bot(models.Model):
+class Bot(ListingStateMixin, models.Model):
     VERIFICATION_STATUS = (
         ("VERIFIED", "Verified"),
         ("UNVERIFIED", "Unverified"),
@@ -149,6 +314,25 @@ class Bot(models.Model):
     tags = models.ManyToManyField(BotTag, related_name="bots", blank=True)
     banner_url = models.URLField(default="https://i.postimg.cc/15TN17rQ/xirprofilback.jpg")
     admins = models.ManyToManyField(Member, related_name="admin_bots")
+    is_listed = models.BooleanField(default=False)
+    trending = models.FloatField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_listed", "-votes"], name="bot_listed_votes_idx"),
+            models.Index(fields=["is_listed", "-date_added"], name="bot_listed_date_idx"),
+            models.Index(fields=["is_listed", "-trending"], name="bot_listed_trending_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.is_listed = self.verified and not self.banned and not self.owner.banned
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "is_listed"}
+        super().save(*args, **kwargs)
+        self.remember_listing_state()
 
     @property
     def rejected(self):
@@ -179,7 +363,7 @@ class Bot(models.Model):
         return embed_handler.bot_vote(self, member)
 
 
-class BotMeta(models.Model):
+class BotMeta(RenderedLongDescMixin, models.Model):
     bot = models.OneToOneField(Bot, on_delete=models.CASCADE, related_name="meta")
     prefix = models.CharField(max_length=20, null=True, blank=True, default="N/A")
     github = models.URLField(null=True, blank=True)
@@ -196,6 +380,8 @@ class BotMeta(models.Model):
     moderator = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, blank=True)
     long_desc = models.TextField(null=True, blank=True)
     total_invites = models.IntegerField(default=0, null=True)
+    long_desc_html = models.TextField(null=True, blank=True, editable=False)
+    long_desc_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
 
 class BotReport(models.Model):
@@ -207,13 +393,47 @@ class BotReport(models.Model):
 
 
 class BotVote(models.Model):
-    id = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    id = models.UUIDField(default=time_ordered_uuid, primary_key=True)
     member = models.ForeignKey(Member, related_name="voted_bots", on_delete=models.CASCADE)
     bot = models.ForeignKey(Bot, related_name="all_votes", on_delete=models.CASCADE, null=True)
     creation_time = models.DateTimeField(null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["member", "bot", "creation_time"], name="botvote_member_bot_time_idx"),
+        ]
+
+
+class BotVoteDaily(models.Model):
+    bot = models.ForeignKey(Bot, related_name="daily_votes", on_delete=models.CASCADE)
+    day = models.DateField()
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bot", "day"], name="botvotedaily_bot_day_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["day", "bot"], name="botvotedaily_day_bot_idx"),
+        ]
+
+
+class BotShard(models.Model):
+    """
+    Last server_count posted for each shard of a bot, the bot total is summed from these rows.
+    """
+    bot = models.ForeignKey(Bot, related_name="shards", on_delete=models.CASCADE)
+    shard_id = models.IntegerField()
+    server_count = models.IntegerField()
+    updated = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bot", "shard_id"], name="botshard_bot_shard_unique"),
+        ]
 
-class Server(models.Model):
+
+class Server(ListingStateMixin, models.Model):
     VERIFICATION_STATUS = (
         ("VERIFIED", "Verified"),
         ("UNVERIFIED", "Unverified"),
@@ -236,6 +456,25 @@ class Server(models.Model):
     banner_url = models.URLField(default="https://i.postimg.cc/15TN17rQ/xirprofilback.jpg")
     banned = models.BooleanField(default=False)
     admins = models.ManyToManyField(Member, related_name="admin_servers")
+    is_listed = models.BooleanField(default=False)
+    trending = models.FloatField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_listed", "-votes"], name="server_listed_votes_idx"),
+            models.Index(fields=["is_listed", "-date_added"], name="server_listed_date_idx"),
+            models.Index(fields=["is_listed", "-trending"], name="server_listed_trending_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.is_listed = self.verified and not self.banned and not self.owner.banned
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "is_listed"}
+        super().save(*args, **kwargs)
+        self.remember_listing_state()
 
     def embed(self, status):
         return embed_handler.server_verification(self, status)
@@ -265,14 +504,15 @@ class Server(models.Model):
 
     @property
     def display_tags(self):
-        return self.tags.all()[:5]
+        # Slicing the list keeps prefetch_related("tags") effective.
+        return list(self.tags.all())[:5]
 
     @property
     def short_desc_display(self):
         return self.short_desc[:100]
 
 
-class ServerMeta(models.Model):
+class ServerMeta(RenderedLongDescMixin, models.Model):
     server = models.OneToOneField(Server, on_delete=models.CASCADE, related_name="meta")
     long_desc = models.TextField(null=True, blank=True)
     ban_reason = models.TextField(null=True, blank=True)
@@ -281,14 +521,35 @@ class ServerMeta(models.Model):
     rejection_reason = models.TextField(null=True, blank=True)
     moderator = models.ForeignKey(Member, on_delete=models.SET_NULL, null=True, blank=True)
     total_invites = models.IntegerField(default=0, null=True)
+    long_desc_html = models.TextField(null=True, blank=True, editable=False)
+    long_desc_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
 
 class ServerVote(models.Model):
-    id = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    id = models.UUIDField(default=time_ordered_uuid, primary_key=True)
     member = models.ForeignKey(Member, related_name="voted_servers", on_delete=models.CASCADE)
     server = models.ForeignKey(Server, related_name="all_votes", on_delete=models.CASCADE, null=True)
     creation_time = models.DateTimeField(null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["member", "server", "creation_time"], name="servervote_member_srv_time_idx"),
+        ]
+
+
+class ServerVoteDaily(models.Model):
+    server = models.ForeignKey(Server, related_name="daily_votes", on_delete=models.CASCADE)
+    day = models.DateField()
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["server", "day"], name="servervotedaily_server_day_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["day", "server"], name="servervotedaily_day_server_idx"),
+        ]
+
 
 class ServerReport(models.Model):
     server = models.ForeignKey(Server, on_delete=models.CASCADE, related_name="reports")
@@ -297,3 +558,53 @@ class ServerReport(models.Model):
     creation_date = models.DateTimeField()
     reviewed = models.BooleanField(default=False)
     reviewer = models.ForeignKey(Member, null=True, related_name="reports_reviewed", on_delete=models.SET_NULL)
+
+
+class OutboxMessage(models.Model):
+    KIND = (
+        ("DM", "Direct Message"),
+        ("EMBED", "Channel Embed"),
+    )
+    STATUS = (
+        ("PENDING", "Pending"),
+        ("SENT", "Sent"),
+        ("FAILED", "Failed"),
+    )
+    idempotency_key = models.CharField(max_length=25, unique=True, default=time_ordered_nonce)
+    kind = models.CharField(max_length=10, choices=KIND)
+    recipient_id = models.BigIntegerField()
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS, default="PENDING")
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(null=True, blank=True)
+    creation_time = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_idx"),
+        ]
+
+
+class StatSeries(models.Model):
+    """
+    Fixed size ring of int32 samples for one metric of one bot/server at one resolution,
+    slot = bucket % capacity where bucket = unix time // step. See utils.timeseries.
+    """
+    CONTENT = (
+        ("bot", "Bot"),
+        ("server", "Server"),
+    )
+    content = models.CharField(max_length=10, choices=CONTENT)
+    object_id = models.BigIntegerField()
+    metric = models.CharField(max_length=20)
+    resolution = models.CharField(max_length=5)
+    last_bucket = models.BigIntegerField()
+    values = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content", "object_id", "metric", "resolution"], name="stat_series_unique"
+            ),
+        ]
@@ -1,7 +1,8 @@
-import markdown as md
 from django import template
 from django.template.defaultfilters import stringfilter
 
+from utils.rendering import render_markdown
+
 
 register = template.Library()
 
@@ -9,4 +10,4 @@ register = template.Library()
 @register.filter()
 @stringfilter
 def markdown(value):
-    return md.markdown(value, extensions=['markdown.extensions.fenced_code'])
+    return render_markdown(value)
@@ -0,0 +1,3 @@
+# The signal receivers are connected when the views import utils.background, tests that
+# don't go through a view still need them
+import utils.background  # noqa: F401
@@ -0,0 +1,29 @@
+from itertools import count
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from main_site.models import Bot, Member, Server
+
+# Discord style snowflakes, the url patterns only match 18-19 digit ids
+ids = count(100000000000000000)
+
+
+def make_member(**kwargs):
+    member_id = next(ids)
+    user = User.objects.create_user(username=str(member_id), password=None)
+    return Member.objects.create(id=member_id, user=user, **kwargs)
+
+
+def make_bot(owner, **kwargs):
+    return Bot.objects.create(
+        id=next(ids), name=kwargs.pop("name", "bot"), owner=owner, invite_link="https://discord.com/oauth2",
+        short_desc=kwargs.pop("short_desc", "A bot"), date_added=timezone.now(), **kwargs
+    )
+
+
+def make_server(owner, **kwargs):
+    return Server.objects.create(
+        id=next(ids), name=kwargs.pop("name", "server"), owner=owner, invite_link="https://discord.gg/x",
+        short_desc=kwargs.pop("short_desc", "A server"), date_added=timezone.now(), **kwargs
+    )
@@ -0,0 +1,99 @@
+import json
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.renderers import FastJSONRenderer
+from api.serializers import BotSerializer, ServerSerializer, bot_values, server_values
+from api.views import BotManageView, BotStatSeriesView, ServerManageView, ServerStatSeriesView
+
+from .factories import make_bot, make_member, make_server
+
+
+class ManageViewTests(TestCase):
+
+    def setUp(self):
+        self.member = make_member()
+        self.bot = make_bot(self.member, verified=True)
+        self.server = make_server(self.member)
+
+    def get(self, view, **kwargs):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, self.member.user)
+        response = view.as_view()(request, **kwargs)
+        response.render()
+        return response
+
+    def assertNotFound(self, response):
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {"detail": "Not found."})
+
+    def test_bot_list_is_not_found_for_members(self):
+        self.assertNotFound(self.get(BotManageView))
+
+    def test_unknown_ids_are_not_found(self):
+        self.assertNotFound(self.get(BotManageView, bot_id="1"))
+        self.assertNotFound(self.get(BotManageView, bot_id="abc"))
+        self.assertNotFound(self.get(ServerManageView, server_id="1"))
+        self.assertNotFound(self.get(ServerManageView, server_id="abc"))
+
+    def test_reads_match_the_drf_serializers(self):
+        self.bot.meta.long_desc = "# hello"
+        self.bot.meta.save()
+        for view, kwarg, target, serializer in (
+            (BotManageView, "bot_id", self.bot, BotSerializer),
+            (ServerManageView, "server_id", self.server, ServerSerializer),
+        ):
+            with self.subTest(view=view.__name__):
+                response = self.get(view, **{kwarg: str(target.id)})
+                self.assertEqual(response.status_code, 200)
+                expected = JSONRenderer().render(serializer(target).data)
+                self.assertEqual(json.loads(response.content), json.loads(expected))
+
+    def test_values_render_like_drf(self):
+        for values, target, serializer in (
+            (bot_values, self.bot, BotSerializer), (server_values, self.server, ServerSerializer)
+        ):
+            with self.subTest(serializer=serializer.__name__):
+                self.assertEqual(
+                    FastJSONRenderer().render(values.get(id=target.id)), JSONRenderer().render(serializer(target).data)
+                )
+
+
+class StatSeriesViewTests(TestCase):
+
+    def setUp(self):
+        self.owner = make_member()
+        self.stranger = make_member()
+        self.staff = make_member()
+        self.staff.user.is_staff = True
+        self.staff.user.save()
+        self.listings = {
+            view: {
+                "listed": make(self.owner, verified=True),
+                "unverified": make(self.owner),
+                "banned": make(self.owner, verified=True, banned=True),
+            }
+            for view, make in ((BotStatSeriesView, make_bot), (ServerStatSeriesView, make_server))
+        }
+
+    def get(self, view, target, member=None):
+        request = APIRequestFactory().get("/", {"resolution": "1d"})
+        if member:
+            force_authenticate(request, member.user)
+        return view.as_view()(request, pk=str(target.id)).status_code
+
+    def test_unlisted_series_are_only_served_to_the_owner_and_staff(self):
+        for view, listings in self.listings.items():
+            for state, target in listings.items():
+                with self.subTest(view=view.__name__, state=state):
+                    expected = 200 if state == "listed" else 404
+                    self.assertEqual(self.get(view, target), expected)
+                    self.assertEqual(self.get(view, target, self.stranger), expected)
+                    self.assertEqual(self.get(view, target, self.owner), 200)
+                    self.assertEqual(self.get(view, target, self.staff), 200)
+
+    def test_unknown_ids_are_not_found(self):
+        self.assertEqual(self.get(BotStatSeriesView, self.stranger), 404)
+        self.assertEqual(self.get(ServerStatSeriesView, self.stranger), 404)
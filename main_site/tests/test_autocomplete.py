@@ -0,0 +1,97 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from main_site.models import Bot
+from utils.autocomplete import PrefixIndex
+
+
+class StubIndex(PrefixIndex):
+    """
+    Reads its rows from a list, a load blocks on `gate` until the test opens it.
+    """
+
+    def __init__(self, rows):
+        super().__init__(Bot)
+        self.data = rows
+        self.gate = threading.Event()
+        self.gate.set()
+        self.loads = 0
+
+    def rows(self):
+        self.loads += 1
+        self.gate.wait(5)
+        return list(self.data)
+
+    def wait_for_reload(self):
+        with self.reload_lock:
+            pass
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+class PrefixIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = StubIndex([(1, "Music", 10), (2, "MusicBot", 50), (3, "Moderator", 5)])
+
+    def test_complete(self):
+        self.assertEqual(names(self.index.complete("mu")), ["MusicBot", "Music"])
+        self.assertEqual(names(self.index.complete("MUSICB")), ["MusicBot"])
+        self.assertEqual(names(self.index.complete("m")), ["MusicBot", "Music", "Moderator"])
+        self.assertEqual(self.index.complete("x"), [])
+
+    def test_first_load_is_single_flight(self):
+        self.index.gate.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.index.complete("mu"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        self.index.gate.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.index.loads, 1)
+        self.assertEqual([names(result) for result in results], [["MusicBot", "Music"]] * 8)
+
+    def test_stale_index_serves_old_arrays_while_reloading(self):
+        self.index.complete("mu")
+        self.index.data = [(1, "Music", 100), (2, "MusicBot", 50)]
+        self.index.gate.clear()
+        self.index.invalidate()
+        for _ in range(20):
+            self.assertEqual(names(self.index.complete("mu")), ["MusicBot", "Music"])
+        self.index.gate.set()
+        self.index.wait_for_reload()
+        self.assertEqual(self.index.loads, 2)
+        self.assertEqual(names(self.index.complete("mu")), ["Music", "MusicBot"])
+        self.assertEqual(names(self.index.complete("mo")), [])
+
+    def test_saves_during_a_reload_are_kept(self):
+        self.index.complete("mu")
+        self.index.gate.clear()
+        self.index.invalidate()
+        self.index.complete("mu")
+        self.index.update(SimpleNamespace(pk=4, name="Mute", votes=1, is_listed=True))
+        self.index.update(SimpleNamespace(pk=3, name="Moderator", votes=5, is_listed=False))
+        self.assertEqual(names(self.index.complete("mut")), ["Mute"])
+        self.index.gate.set()
+        self.index.wait_for_reload()
+        self.assertEqual(names(self.index.complete("mut")), ["Mute"])
+        self.assertEqual(names(self.index.complete("mo")), [])
+
+    def test_invalidation_during_a_reload_triggers_another(self):
+        self.index.complete("mu")
+        self.index.gate.clear()
+        self.index.invalidate()
+        self.index.complete("mu")
+        self.index.invalidate()
+        self.index.gate.set()
+        self.index.wait_for_reload()
+        self.index.complete("mu")
+        self.index.wait_for_reload()
+        self.assertEqual(self.index.loads, 3)
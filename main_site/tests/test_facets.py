@@ -0,0 +1,83 @@
+import random
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from main_site.models import Bot, BotTag
+from utils.facets import bot_facets
+
+from .factories import make_bot, make_member
+
+
+class TagFacetTests(TestCase):
+    """
+    Incremental updates from saves must leave the tags exactly as a full recount would.
+    """
+
+    def setUp(self):
+        self.addCleanup(setattr, bot_facets, "size", bot_facets.size)
+        bot_facets.size = 3
+        self.owner = make_member()
+        self.tag = BotTag.objects.create(name="music", icon="fa-music")
+
+    def make_bot(self, **kwargs):
+        bot = make_bot(self.owner, **kwargs)
+        bot.tags.add(self.tag)
+        # Ban notifications name the moderator
+        bot.meta.moderator = self.owner
+        bot.meta.save()
+        return Bot.objects.get(id=bot.id)
+
+    def facets(self):
+        tag = BotTag.objects.get(name=self.tag.name)
+        return tag.listed_count, tag.top_voted, tag.top_trending, tag.votes_floor, tag.trending_floor
+
+    def assertMatchesRecount(self):
+        incremental = self.facets()
+        bot_facets.refresh_all()
+        self.assertEqual(incremental, self.facets())
+
+    def test_listing_moves_the_count_by_one(self):
+        bot = self.make_bot()
+        self.assertEqual(self.facets()[0], 0)
+        bot.verified = True
+        bot.save(update_fields=["verified"])
+        self.assertEqual(self.facets()[:2], (1, [bot.id]))
+        bot.banned = True
+        bot.save(update_fields=["banned"])
+        self.assertEqual(self.facets()[:2], (0, []))
+
+    def test_unrelated_save_does_not_touch_tags(self):
+        bot = self.make_bot(verified=True)
+        bot.server_count = 1200
+        with CaptureQueriesContext(connection) as queries:
+            bot.save()
+        self.assertFalse([query for query in queries if "bottag" in query["sql"].lower()])
+
+    def test_random_moderation_and_votes_match_recount(self):
+        random.seed(12)
+        bots = [self.make_bot(votes=random.randint(0, 50), trending=random.random() * 10) for _ in range(8)]
+        for _ in range(60):
+            bot = Bot.objects.get(id=random.choice(bots).id)
+            change = random.choice(("verified", "banned", "votes", "trending"))
+            if change in ("verified", "banned"):
+                setattr(bot, change, not getattr(bot, change))
+                bot.save(update_fields=[change])
+            else:
+                setattr(bot, change, max(0, getattr(bot, change) + random.choice((-5, -1, 1, 5))))
+                bot.save(update_fields=[change])
+            self.assertMatchesRecount()
+
+    def test_migration_backfill_matches_recount(self):
+        migration = import_module("main_site.migrations.0038_backfill_tag_facets")
+        bot_facets.size = migration.FACET_SIZE
+        for votes in range(migration.FACET_SIZE + 5):
+            self.make_bot(verified=True, votes=votes, trending=votes / 7)
+        self.make_bot(votes=100)
+        BotTag.objects.update(listed_count=0, top_voted=[], top_trending=[], votes_floor=None, trending_floor=None)
+        migration.backfill_tag_facets(apps, None)
+        self.assertEqual(self.facets()[0], migration.FACET_SIZE + 5)
+        self.assertMatchesRecount()
@@ -0,0 +1,133 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.private_views import BotStatusEditView, ServerStatusEditView
+from main_site.models import Bot, Member, Server
+
+from .factories import make_bot, make_member, make_server
+
+
+class ListingSyncTests(TestCase):
+    """
+    is_listed must equal verified and not banned and not owner.banned after every moderation path.
+    """
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.moderator = make_member()
+        self.moderator.user.is_superuser = True
+        self.moderator.user.save()
+        self.owner = make_member()
+        self.bot = make_bot(self.owner)
+        self.server = make_server(self.owner)
+
+    def moderate(self, target, status, reason=None):
+        view, kwarg = (BotStatusEditView, "bot_id") if isinstance(target, Bot) else (ServerStatusEditView, "server_id")
+        request = self.factory.put(
+            "/", {"verification_status": status, "moderator_id": self.moderator.id, "reason": reason}, format="json"
+        )
+        force_authenticate(request, self.moderator.user)
+        response = view.as_view()(request, **{kwarg: target.id})
+        self.assertEqual(response.status_code, 200)
+        target.refresh_from_db()
+
+    def assertListed(self, target, listed):
+        target.refresh_from_db()
+        self.assertEqual(target.is_listed, listed)
+        self.assertEqual(target.is_listed, target.verified and not target.banned and not target.owner.banned)
+        self.assertEqual(type(target).objects.listed().filter(id=target.id).exists(), listed)
+
+    def test_new_listings_are_unlisted(self):
+        self.assertListed(self.bot, False)
+        self.assertListed(self.server, False)
+
+    def test_verify(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "VERIFIED")
+            self.assertListed(target, True)
+
+    def test_reject(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "REJECTED", reason="Offline")
+            self.assertEqual(target.verification_status, "REJECTED")
+            self.assertListed(target, False)
+
+    def test_third_rejection_bans(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "VERIFIED")
+            for _ in range(3):
+                self.moderate(target, "REJECTED", reason="Offline")
+            self.assertTrue(target.banned)
+            self.assertListed(target, False)
+
+    def test_ban_and_unban(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "VERIFIED")
+            self.moderate(target, "BANNED", reason="Spam")
+            self.assertListed(target, False)
+            self.moderate(target, "UNBANNED")
+            self.assertListed(target, True)
+
+    def test_unban_of_never_verified_listing(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "BANNED", reason="Spam")
+            self.moderate(target, "UNBANNED")
+            self.assertListed(target, True)
+
+    def test_owner_ban_and_unban(self):
+        for target in (self.bot, self.server):
+            self.moderate(target, "VERIFIED")
+        unverified_bot = make_bot(self.owner)
+        banned_server = make_server(self.owner, verified=True, banned=True)
+
+        self.owner.banned = True
+        self.owner.save()
+        for target in (self.bot, self.server, unverified_bot, banned_server):
+            self.assertListed(target, False)
+
+        self.owner.banned = False
+        self.owner.save()
+        self.assertListed(self.bot, True)
+        self.assertListed(self.server, True)
+        self.assertListed(unverified_bot, False)
+        self.assertListed(banned_server, False)
+
+    def test_moderating_a_banned_owners_listing_keeps_it_unlisted(self):
+        self.owner.banned = True
+        self.owner.save()
+        for target in (self.bot, self.server):
+            self.moderate(target, "VERIFIED")
+            self.assertListed(target, False)
+            self.moderate(target, "UNBANNED")
+            self.assertListed(target, False)
+
+    def test_listed_queryset_matches_flags(self):
+        self.moderate(self.bot, "VERIFIED")
+        self.moderate(self.server, "BANNED", reason="Spam")
+        self.assertEqual(list(Bot.objects.listed()), [self.bot])
+        self.assertEqual(list(Server.objects.listed()), [])
+
+    def test_unrelated_member_save_skips_the_listing_sync(self):
+        self.moderate(self.bot, "VERIFIED")
+        owner = Member.objects.get(id=self.owner.id)
+        owner.dm_channel = 1234
+        with mock.patch("utils.page_cache.invalidate") as invalidate, self.assertNumQueries(1):
+            owner.save()
+        invalidate.assert_not_called()
+        self.assertListed(self.bot, True)
+
+    def test_new_avatar_only_refreshes_the_owners_bot_pages(self):
+        owner = Member.objects.get(id=self.owner.id)
+        owner.avatar = "a_new"
+        with mock.patch("utils.page_cache.invalidate") as invalidate, self.assertNumQueries(2):
+            owner.save()
+        invalidate.assert_called_once_with(f"bot:{self.bot.id}")
+
+    def test_owner_ban_through_a_loaded_member(self):
+        self.moderate(self.bot, "VERIFIED")
+        owner = Member.objects.get(id=self.owner.id)
+        owner.banned = True
+        owner.save()
+        self.assertListed(self.bot, False)
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.private_views import BotStatusEditView
+from main_site.models import OutboxMessage
+
+from .factories import make_bot, make_member
+
+
+class ModerationTransactionTests(TestCase):
+    """
+    A moderation request either lands with all of its notifications or leaves nothing behind.
+    """
+
+    def setUp(self):
+        self.moderator = make_member()
+        self.moderator.user.is_superuser = True
+        self.moderator.user.save()
+        self.bot = make_bot(make_member())
+
+    def moderate(self, status, reason=None):
+        request = APIRequestFactory().put(
+            "/", {"verification_status": status, "moderator_id": self.moderator.id, "reason": reason}, format="json"
+        )
+        force_authenticate(request, self.moderator.user)
+        return BotStatusEditView.as_view()(request, bot_id=self.bot.id)
+
+    def test_failed_notification_rolls_back_the_ban(self):
+        queued = OutboxMessage.objects.count()
+        with mock.patch("utils.outbox.embed", side_effect=RuntimeError("embed")):
+            with self.assertRaises(RuntimeError):
+                self.moderate("BANNED", reason="Spam")
+        self.bot.refresh_from_db()
+        self.bot.meta.refresh_from_db()
+        self.assertFalse(self.bot.banned)
+        self.assertIsNone(self.bot.meta.ban_reason)
+        self.assertIsNone(self.bot.meta.moderator_id)
+        self.assertEqual(OutboxMessage.objects.count(), queued)
+
+    def test_ban_commits_with_its_notifications(self):
+        queued = OutboxMessage.objects.count()
+        self.assertEqual(self.moderate("BANNED", reason="Spam").status_code, 200)
+        self.bot.refresh_from_db()
+        self.assertTrue(self.bot.banned)
+        self.assertEqual(OutboxMessage.objects.count(), queued + 2)
+
+    def test_unknown_status_writes_nothing(self):
+        self.assertEqual(self.moderate("LOST").status_code, 400)
+        self.bot.meta.refresh_from_db()
+        self.assertIsNone(self.bot.meta.moderator_id)
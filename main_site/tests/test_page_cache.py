@@ -0,0 +1,53 @@
+import re
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from main_site.views import IndexView, ServerIndexView
+
+from .factories import make_bot, make_member, make_server
+
+
+@override_settings(ROOT_URLCONF="main_site.tests.urls")
+class FreshFragmentTests(TestCase):
+    """
+    Cached index pages still show new random picks on every request.
+    """
+
+    def setUp(self):
+        cache.clear()
+        owner = make_member()
+        self.bots = [make_bot(owner, name=f"bot-{index}", verified=True) for index in range(2)]
+        self.servers = [make_server(owner, name=f"server-{index}", verified=True) for index in range(2)]
+
+    def render(self, view):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        response = view.as_view()(request)
+        if hasattr(response, "render"):
+            response.render()
+        return response.content.decode()
+
+    def fragment(self, html, template):
+        return re.search(f"<!--fresh:{template}-->(.*?)<!--/fresh-->", html, re.S)[1]
+
+    def assertFreshPicks(self, view, helper, template, picks):
+        with mock.patch(f"main_site.views.{helper}", return_value=[picks[0]]):
+            first = self.render(view)
+        with mock.patch(f"main_site.views.{helper}", return_value=[picks[1]]), \
+                mock.patch.object(view, "get") as get:
+            second = self.render(view)
+        get.assert_not_called()
+        self.assertIn(picks[0].name, self.fragment(first, template))
+        self.assertNotIn(picks[0].name, self.fragment(second, template))
+        self.assertIn(picks[1].name, self.fragment(second, template))
+        self.assertEqual(first.replace(self.fragment(first, template), ""),
+                         second.replace(self.fragment(second, template), ""))
+
+    def test_index_random_bots(self):
+        self.assertFreshPicks(IndexView, "get_random_bots", "fragments/random_bots.html", self.bots)
+
+    def test_server_index_random_servers(self):
+        self.assertFreshPicks(ServerIndexView, "get_random_servers", "fragments/random_servers.html", self.servers)
@@ -0,0 +1,62 @@
+import json
+import base64
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from main_site.views import BotListView, BotSearchView
+
+from .factories import make_bot, make_member
+
+
+def cursor(*payload, raw=None):
+    raw = json.dumps(list(payload)) if raw is None else raw
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@override_settings(ROOT_URLCONF="main_site.tests.urls")
+class MalformedCursorTests(TestCase):
+    """
+    A crafted ?page= cursor serves the first page, it never reaches the database.
+    """
+    malformed = [
+        cursor("after", None, 1),
+        cursor(raw='["after", 1e400, 1]'),
+        cursor(raw='["after", NaN, 1]'),
+        cursor("after", {"a": 1}, 1),
+        cursor("after", [1, 2], 1),
+        cursor("after", "abc", 1),
+        cursor("after", 10 ** 30, 1),
+        cursor("after", 1, 10 ** 30),
+        cursor("after", 1, None),
+        cursor("sideways", 1, 1),
+        cursor("after", 1),
+        cursor(raw='"after"'),
+        "not base64!",
+        "",
+    ]
+
+    def setUp(self):
+        cache.clear()
+        owner = make_member()
+        for votes in range(45):
+            make_bot(owner, name=f"music bot {votes}", verified=True, votes=votes)
+
+    def render(self, view, **params):
+        request = RequestFactory().get("/", params)
+        request.user = AnonymousUser()
+        return [bot.id for bot in view.as_view()(request).context_data["object_list"]]
+
+    def test_bot_list(self):
+        first = self.render(BotListView)
+        for page in self.malformed:
+            with self.subTest(page=page):
+                self.assertEqual(self.render(BotListView, page=page), first)
+
+    def test_ranked_search(self):
+        first = self.render(BotSearchView, q="music")
+        self.assertEqual(len(first), 40)
+        for page in self.malformed:
+            with self.subTest(page=page):
+                self.assertEqual(self.render(BotSearchView, q="music", page=page), first)
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from main_site.models import BotTag, ServerTag
+from main_site.views import BotListView, IndexView, ProfileView, ServerIndexView
+from utils.sampler import bot_sampler, server_sampler
+
+from .factories import make_bot, make_member, make_server
+
+
+@override_settings(ROOT_URLCONF="main_site.tests.urls")
+class QueryBudgetTests(TestCase):
+    """
+    Listing pages run a fixed number of queries whatever the number of cards on them.
+    Each page is rendered with one card and again with a dozen, both under the same budget.
+    """
+
+    def setUp(self):
+        self.owner = make_member()
+        self.bot_tags = [BotTag.objects.create(name=f"bot-tag-{index}", icon="fa") for index in range(3)]
+        self.server_tags = [ServerTag.objects.create(name=f"server-tag-{index}", icon="fa") for index in range(3)]
+
+    def add_listings(self, count):
+        for _ in range(count):
+            bot = make_bot(make_member(), verified=True)
+            bot.tags.set(self.bot_tags)
+            bot.admins.add(self.owner)
+            server = make_server(make_member(), verified=True)
+            server.tags.set(self.server_tags)
+            server.admins.add(self.owner)
+            make_bot(self.owner, verified=True).tags.set(self.bot_tags)
+
+    def render(self, view, user=None, **kwargs):
+        # Every request misses the page cache and the in-process pools, the worst case
+        cache.clear()
+        bot_sampler.invalidate()
+        server_sampler.invalidate()
+        request = RequestFactory().get("/")
+        request.user = user or AnonymousUser()
+        response = view.as_view()(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def assertQueryBudget(self, budget, view, user=None, **kwargs):
+        for count in (1, 11):
+            self.add_listings(count)
+            with self.assertNumQueries(budget):
+                self.render(view, user, **kwargs)
+
+    def test_index(self):
+        self.assertQueryBudget(7, IndexView)
+
+    def test_bot_list(self):
+        self.assertQueryBudget(2, BotListView)
+
+    def test_server_index(self):
+        self.assertQueryBudget(8, ServerIndexView)
+
+    def test_own_profile(self):
+        self.assertQueryBudget(4, ProfileView, user=self.owner.user)
+
+    def test_other_profile(self):
+        self.assertQueryBudget(7, ProfileView, user=make_member().user, user_id=self.owner.id)
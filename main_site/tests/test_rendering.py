@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from api.serializers import BotSerializer
+from utils.rendering import render_markdown
+
+from .factories import make_bot, make_member
+
+
+class SanitizeTests(TestCase):
+
+    def test_script_links_are_neutralized(self):
+        payloads = (
+            "[x](javascript:alert(1))",
+            "[x](JavaScript:alert(1))",
+            "[x](jav&#x61;script:alert(1))",
+            "[x](&#106;avascript:alert(1))",
+            "[x](&#x6A&#x61vascript:alert(1))",
+            "[x](javascript&colon;alert(1))",
+            "[x](java&Tab;script:alert(1))",
+            "[x](java&#9;script:alert(1))",
+            "[x](&#0;javascript:alert(1))",
+            "[x](data:text/html;base64,PHNjcmlwdD4=)",
+            "![x](vbscript:alert(1))",
+        )
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                html = render_markdown(payload)
+                self.assertIn('="#"', html)
+                self.assertNotIn("script", html.lower().replace("&", ""))
+
+    def test_safe_links_are_kept(self):
+        for url in ("https://example.com/a?b=1&c=2", "mailto:a@example.com", "/bots/1/", "#top"):
+            with self.subTest(url=url):
+                self.assertNotIn('href="#"', render_markdown(f"[x]({url})"))
+
+    def test_raw_html_is_escaped(self):
+        self.assertIn("&lt;script&gt;", render_markdown("<script>alert(1)</script>"))
+
+    def test_rendered_columns_are_not_public(self):
+        bot = make_bot(make_member())
+        bot.meta.long_desc = "# hello"
+        bot.meta.save()
+        meta = BotSerializer(bot).data["meta"]
+        self.assertNotIn("long_desc_html", meta)
+        self.assertNotIn("long_desc_hash", meta)
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+
+from main_site.models import BotTag
+from main_site.views import BotSearchView
+
+from .factories import make_bot, make_member
+
+
+class SearchPaginationTests(TestCase):
+
+    def setUp(self):
+        owner = make_member()
+        self.tag = BotTag.objects.create(name="music", icon="fa-music")
+        self.tagged = set()
+        for votes in range(45):
+            bot = make_bot(owner, name=f"music bot {votes}", verified=True, votes=votes)
+            bot.tags.add(self.tag)
+            self.tagged.add(bot.id)
+        for votes in range(5):
+            make_bot(owner, name=f"music player {votes}", verified=True, votes=100 + votes)
+
+    def search(self, **params):
+        request = RequestFactory().get("/bots/search/", params)
+        request.user = AnonymousUser()
+        return BotSearchView.as_view()(request).context_data
+
+    def test_pager_keeps_query_and_tag(self):
+        first = self.search(q="music", tag="music")
+        self.assertEqual(first["search_params"], "q=music&tag=music")
+        self.assertEqual(len(first["object_list"]), 40)
+        self.assertTrue(first["page_obj"].has_next())
+
+        second = self.search(page=first["page_obj"].next_page_number(), q="music", tag="music")
+        ids = [bot.id for page in (first, second) for bot in page["object_list"]]
+        self.assertEqual(len(ids), 45)
+        self.assertEqual(set(ids), self.tagged)
+        self.assertFalse(second["page_obj"].has_next())
+
+    def test_search_params_are_urlencoded(self):
+        context = self.search(q="rock & roll", tag="music")
+        self.assertEqual(context["search_params"], "q=rock+%26+roll&tag=music")
+        self.assertEqual(self.search(tag="music")["search_params"], "tag=music")
@@ -0,0 +1,111 @@
+from unittest import mock, skipUnless
+
+from django.db import DataError, OperationalError, connection
+from django.test import TestCase
+
+from api.views import BotStatsView
+from main_site.models import Bot, BotShard
+from utils.stats import StatsBuffer
+
+from .factories import make_bot, make_member
+
+
+class StatsBufferTests(TestCase):
+
+    def setUp(self):
+        owner = make_member()
+        self.good = make_bot(owner)
+        self.bad = make_bot(owner)
+        self.buffer = StatsBuffer()
+        # Keep the flusher thread out of the test, flush() is called directly
+        self.buffer.flusher = True
+
+    def server_count(self, bot):
+        return Bot.objects.values_list("server_count", flat=True).get(id=bot.id)
+
+    def worker(self):
+        buffer = StatsBuffer()
+        buffer.flusher = True
+        return buffer
+
+    def shard(self, shard_id, server_count, shard_count=4, bot=None):
+        return {"bot_id": (bot or self.good).id, "shard_id": shard_id, "shard_count": shard_count,
+                "server_count": server_count}
+
+    def test_shards_posted_to_different_workers_are_summed(self):
+        # Each gunicorn worker has its own buffer, the total can't depend on which one flushes last
+        first, second = self.worker(), self.worker()
+        first.submit([self.shard(0, 10), self.shard(1, 20)])
+        second.submit([self.shard(2, 30), self.shard(3, 40)])
+        first.flush()
+        self.assertEqual(self.server_count(self.good), 30)
+        second.flush()
+        self.assertEqual(self.server_count(self.good), 100)
+        first.submit([self.shard(0, 15)])
+        first.flush()
+        self.assertEqual(self.server_count(self.good), 105)
+
+    def test_posts_inside_an_interval_collapse(self):
+        for server_count in (1, 2, 3):
+            self.buffer.submit([self.shard(0, server_count), self.shard(1, server_count * 10)])
+            self.buffer.submit([self.shard(0, 1, shard_count=2, bot=self.bad)])
+        self.assertEqual(self.buffer.pending[self.good.id], {"shard_count": 4, "shards": {0: 3, 1: 30}})
+        with self.assertNumQueries(7):
+            # Shard upsert and sums, then in a savepoint the bulk server_count and one update per shard_count
+            self.buffer.flush()
+        self.assertEqual(BotShard.objects.filter(bot=self.good).count(), 2)
+        self.assertEqual(self.server_count(self.good), 33)
+        self.assertEqual(self.server_count(self.bad), 1)
+        self.buffer.submit([self.shard(0, 3), self.shard(1, 30)])
+        with self.assertNumQueries(2):
+            # Same total as the last write, nothing to update
+            self.buffer.flush()
+
+    def test_shards_past_the_shard_count_are_left_out(self):
+        self.buffer.submit([self.shard(0, 10), self.shard(3, 40)])
+        self.buffer.flush()
+        self.assertEqual(self.server_count(self.good), 50)
+        self.buffer.submit([self.shard(0, 10, shard_count=2), self.shard(1, 20, shard_count=2)])
+        self.buffer.flush()
+        self.assertEqual(self.server_count(self.good), 30)
+
+    def test_clean_bounds_counts_to_the_column(self):
+        BotStatsView.clean({"bot_id": 1, "server_count": 2147483647, "shard_count": 2147483647})
+        for field in ("server_count", "shard_count"):
+            for value in (-1, 2147483648):
+                with self.subTest(field=field, value=value), self.assertRaises(ValueError):
+                    BotStatsView.clean({"bot_id": 1, field: value})
+
+    def test_rejected_row_is_dropped_and_the_rest_written(self):
+        write = StatsBuffer.write
+
+        def reject_bad(changes):
+            if self.bad.id in changes:
+                raise DataError("integer out of range")
+            write(changes)
+
+        self.buffer.submit([{"bot_id": self.good.id, "server_count": 10}, {"bot_id": self.bad.id, "server_count": 20}])
+        with mock.patch.object(self.buffer, "write", side_effect=reject_bad):
+            with self.assertLogs("utils.stats", "ERROR"):
+                self.buffer.flush()
+        self.assertEqual(self.server_count(self.good), 10)
+        self.assertEqual(self.buffer.pending, {})
+
+    def test_unavailable_database_requeues_the_batch(self):
+        self.buffer.submit([{"bot_id": self.good.id, "server_count": 10}])
+        with mock.patch.object(self.buffer, "write", side_effect=OperationalError("gone")):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.pending, {self.good.id: {"server_count": 10}})
+        self.buffer.flush()
+        self.assertEqual(self.server_count(self.good), 10)
+
+    @skipUnless(connection.vendor == "postgresql", "SQLite integers do not overflow at 32 bits")
+    def test_out_of_range_count_does_not_block_other_bots(self):
+        self.buffer.submit([
+            {"bot_id": self.good.id, "server_count": 10}, {"bot_id": self.bad.id, "server_count": 2 ** 31}
+        ])
+        with self.assertLogs("utils.stats", "ERROR"):
+            self.buffer.flush()
+        self.assertEqual(self.server_count(self.good), 10)
+        self.assertEqual(self.buffer.pending, {})
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from main_site.models import MemberMeta
+
+from .factories import make_member
+
+
+class RefreshOauthTokensTests(TransactionTestCase):
+    # The refreshes run on worker threads, they only see committed rows
+
+    def setUp(self):
+        now = timezone.now()
+        self.members = [make_member() for _ in range(5)]
+        for index, member in enumerate(self.members):
+            MemberMeta.objects.filter(member=member).update(
+                access_token=f"access-{index}", refresh_token=f"refresh-{index}",
+                access_token_expiry=now + timedelta(minutes=index)
+            )
+
+    def expiry(self, member):
+        return MemberMeta.objects.values_list("access_token_expiry", flat=True).get(member=member)
+
+    def test_failing_member_does_not_end_the_run(self):
+        def refresh_access_token(refresh_token):
+            # The soonest expiring member fails on every attempt, e.g. discord keeps returning a 5xx
+            if refresh_token == "refresh-0":
+                return {}
+            return {"access_token": "new", "refresh_token": refresh_token, "expires_in": 7 * 24 * 3600}
+
+        out = StringIO()
+        with mock.patch("main_site.models.oauth.refresh_access_token", side_effect=refresh_access_token) as refresh:
+            call_command("refresh_oauth_tokens", batch_size=2, concurrency=2, stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Refreshed 4 tokens, 1 failed.")
+        self.assertEqual([call.args[0] for call in refresh.call_args_list].count("refresh-0"), 1)
+        self.assertLess(self.expiry(self.members[0]), timezone.now() + timedelta(days=1))
+        for member in self.members[1:]:
+            self.assertGreater(self.expiry(member), timezone.now() + timedelta(days=1))
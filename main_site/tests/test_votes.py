@@ -0,0 +1,101 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import BotManageView
+
+from main_site.models import Bot, BotVote
+from utils import trending
+from utils.votes import AlreadyVoted, bot_votes, server_votes
+
+from .factories import make_bot, make_member, make_server
+
+
+class VoteTrendingTests(TestCase):
+    """
+    The trending score kept by the vote UPDATE must match a rebuild from the ledger.
+    """
+
+    def setUp(self):
+        owner = make_member()
+        self.bot = make_bot(owner, verified=True)
+        self.server = make_server(owner, verified=True)
+
+    def cast(self, ledger, target):
+        target = ledger.cast(make_member(), target.id)
+        vote = ledger.vote_model.objects.filter(**{ledger.fk_field: target}).latest("creation_time")
+        return target, vote
+
+    def test_first_vote(self):
+        for ledger, target in ((bot_votes, self.bot), (server_votes, self.server)):
+            target, vote = self.cast(ledger, target)
+            self.assertEqual(target.votes, 1)
+            self.assertAlmostEqual(target.trending, trending.vote_weight(vote.creation_time), places=6)
+
+    def test_incremental_score_matches_rebuild(self):
+        for ledger, target in ((bot_votes, self.bot), (server_votes, self.server)):
+            for _ in range(5):
+                target, _ = self.cast(ledger, target)
+            incremental = target.trending
+            ledger.rebuild_trending()
+            target.refresh_from_db()
+            self.assertEqual(target.votes, 5)
+            self.assertAlmostEqual(incremental, target.trending, places=6)
+
+    def test_cooldown(self):
+        member = make_member()
+        bot_votes.cast(member, self.bot.id)
+        with self.assertRaises(AlreadyVoted):
+            bot_votes.cast(member, self.bot.id)
+        self.assertEqual(BotVote.objects.filter(bot=self.bot).count(), 1)
+
+    def test_unlisted_target(self):
+        unlisted = make_bot(make_member())
+        with self.assertRaises(Bot.DoesNotExist):
+            bot_votes.cast(make_member(), unlisted.id)
+
+    def test_plain_save_keeps_concurrent_votes(self):
+        for ledger, target in ((bot_votes, self.bot), (server_votes, self.server)):
+            stale = type(target).objects.get(id=target.id)
+            voted, _ = self.cast(ledger, target)
+            stale.short_desc = "Edited"
+            stale.save()
+            stale.refresh_from_db()
+            self.assertEqual((stale.votes, stale.trending), (1, voted.trending))
+            self.assertEqual(stale.short_desc, "Edited")
+
+    def test_stats_post_keeps_concurrent_votes(self):
+        request = APIRequestFactory().post("/", {"server_count": 42}, format="json")
+        force_authenticate(request, self.bot.owner.user)
+        with mock.patch("api.views.get_object_or_404", side_effect=lambda model, **lookup: stale):
+            stale = Bot.objects.get(id=self.bot.id)
+            voted, _ = self.cast(bot_votes, self.bot)
+            self.assertEqual(BotManageView.as_view()(request, bot_id=self.bot.id).status_code, 200)
+        self.bot.refresh_from_db()
+        self.assertEqual((self.bot.votes, self.bot.server_count), (1, 42))
+
+    def test_explicit_update_fields_still_write_votes(self):
+        self.bot.votes = 7
+        self.bot.save(update_fields=["votes"])
+        self.bot.refresh_from_db()
+        self.assertEqual(self.bot.votes, 7)
+
+
+@skipUnless(connection.vendor == "postgresql", "Only PostgreSQL raises on exp() underflow, SQLite returns 0")
+class PostgresTrendingTests(TestCase):
+
+    def test_first_vote_does_not_underflow(self):
+        server = make_server(make_member(), verified=True)
+        self.assertEqual(server.trending, 0)
+        server = server_votes.cast(make_member(), server.id)
+        self.assertEqual(server.votes, 1)
+        self.assertGreater(server.trending, 1000)
+
+    def test_far_apart_scores(self):
+        bot = make_bot(make_member(), verified=True, trending=5000.0)
+        vote = trending.add_vote(trending.TRENDING_EPOCH)
+        Bot.objects.filter(id=bot.id).update(trending=vote)
+        bot.refresh_from_db()
+        self.assertEqual(bot.trending, 5000.0)
@@ -0,0 +1,26 @@
+"""
+The url names the templates reverse, so pages can be rendered in tests without main_site.urls,
+whose edit, add and moderation views are not part of this tree.
+"""
+from django.http import HttpResponse
+from django.urls import path
+
+
+def stub(request, **kwargs):
+    return HttpResponse()
+
+
+NAMES = (
+    "home", "about", "privacy", "terms", "login", "normal_login", "logout", "bots", "bot_add", "bot_edit", "bot_search",
+    "servers", "server_add", "server_list", "server_search", "staff_panel", "edit_profile",
+)
+
+urlpatterns = [path(f"{name}/", stub, name=name) for name in NAMES] + [
+    path("bots/<bot_id>/", stub, name="bot_single"),
+    path("bots/<bot_id>/edit/", stub, name="bot_edit_view"),
+    path("bots/<bot_id>/invite/", stub, name="bot_invite"),
+    path("servers/<server_id>/", stub, name="server_single"),
+    path("servers/<server_id>/edit/", stub, name="server_edit_view"),
+    path("servers/<server_id>/invite/", stub, name="server_invite"),
+    path("users/<user_id>/", stub, name="profile"),
+]
@@ -1,6 +1,8 @@
 from datetime import datetime, timezone
+from urllib.parse import urlencode
 
 from django.views import View
+from django.db import transaction
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.shortcuts import render, redirect
@@ -10,16 +12,20 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import login, logout, authenticate
 
 from utils.oauth import Oauth
-from utils.hashing import Hasher
 from utils.mixins import ResponseMixin
-from utils.api_client import DiscordAPIClient
+from utils.page_cache import AnonymousPageCacheMixin
+from utils.counters import bot_invites, server_invites
+from utils.pagination import KeysetPage, KeysetPaginator, KeysetPaginationMixin
+from utils.sampler import bot_sampler, server_sampler
+from utils.votes import AlreadyVoted, bot_votes, server_votes
+from utils.search import bot_search, server_search
+from utils.facets import bot_facets, server_facets
+from utils.discord_users import DiscordUserUnavailable, discord_users
 from utils.background import create_user, update_user
 from .models import Bot, BotTag, Member, BotVote, BotReport, Server, ServerTag, ServerReport, ServerVote
 
 popup_oauth = Oauth()
 normal_oauth = Oauth(redirect_uri=settings.AUTH_HANDLER_URL)
-hasher = Hasher()
-discord_client = DiscordAPIClient()
 
 # --- SAFE DATA FETCHING FUNCTIONS ---
 # These prevent the site from crashing if the database is empty
@@ -31,26 +37,29 @@ def get_bot_tags():
 
 def get_server_tags():
     try:
-        return ServerTag.objects.all()
+        return ServerTag.objects.order_by("-listed_count", "name")
     except:
         return []
 
 def get_random_bots():
     try:
-        return Bot.objects.filter(
-            verified=True, banned=False, owner__banned=False
-        ).order_by("date_added").distinct()[:8][::-1]
+        return bot_sampler.get_random(8)
     except:
         return []
 
 def get_random_servers():
     try:
-        return Server.objects.filter(
-            verified=True, banned=False, owner__banned=False
-        ).order_by("date_added").distinct()[:8][::-1]
+        return server_sampler.get_random(8)
     except:
         return []
 
+def get_profile_context(request, member):
+    if request.user.is_authenticated and request.user.member == member:
+        bots, servers = member.bots.all(), member.admin_servers.all()
+    else:
+        bots, servers = member.bots.filter(verified=True), member.servers.filter(verified=True)
+    return {"member": member, "bots": bots.for_cards(), "servers": servers.for_cards()}
+
 # --- VIEWS ---
 
 def login_handler_view(request):
@@ -67,41 +76,38 @@ def discord_login_view(request):
     return redirect(popup_oauth.discord_login_url)
 
 def server_refresh(request):
-    admin_guilds = [
-        (guild.get("id"), guild.get("name")) for guild in request.user.member.refresh_admin_servers()
-        if not Server.objects.filter(id=guild.get("id")).exists()
-    ]
-    request.user.member.sync_servers()
+    member = request.user.member
+    guilds = member.refresh_admin_servers(force=True)
+    listed = set(Server.objects.filter(id__in=[guild.get("id") for guild in guilds]).values_list("id", flat=True))
+    admin_guilds = [(guild.get("id"), guild.get("name")) for guild in guilds if int(guild.get("id")) not in listed]
+    member.sync_servers()
     return render(request, "refresh_pages/server_select.html", {"admin_guilds": admin_guilds})
 
 def support_server_invite(request):
     return redirect(to="https://discord.gg/JKWhgPDnPp")
 
 def bot_invite_counter(request, bot_id):
-    try:
-        bot = Bot.objects.get(id=bot_id)
-        bot.meta.total_invites += 1
-        bot.meta.save()
-        return redirect(to=bot.invite_link)
-    except:
+    invite_link = bot_invites.get_invite_link(bot_id)
+    if invite_link is None:
         return render(request, "404.html")
+    bot_invites.hit(bot_id)
+    return redirect(to=invite_link)
 
 def server_invite_counter(request, server_id):
-    try:
-        server = Server.objects.get(id=server_id)
-        server.meta.total_invites += 1
-        server.meta.save()
-        return redirect(to=server.invite_link)
-    except:
+    invite_link = server_invites.get_invite_link(server_id)
+    if invite_link is None:
         return render(request, "404.html")
+    server_invites.hit(server_id)
+    return redirect(to=invite_link)
 
-class BotView(View, ResponseMixin):
+class BotView(AnonymousPageCacheMixin, View, ResponseMixin):
     template_name = "bot_page.html"
     model = Bot
+    cache_tags = ("bot:{bot_id}",)
 
     def get(self, request, bot_id):
         try:
-            bot = self.model.objects.get(id=bot_id)
+            bot = self.model.objects.for_detail().get(id=bot_id)
             if bot.banned or not bot.verified:
                 if request.user.is_authenticated:
                     if request.user.member == bot.owner or request.user.is_staff:
@@ -131,7 +137,7 @@ class LoginView(View):
             user_json = oauth.get_user_json(token_json.get("access_token"))
             user_json["token_data"] = token_json
             user_id = user_json.get("id")
-            user = authenticate(username=user_id, password=hasher.get_hashed_pass(user_id))
+            user = authenticate(request, discord_id=user_id)
             
             if user is None:
                 user = create_user(user_json)
@@ -139,34 +145,100 @@ class LoginView(View):
                 update_user(user, user_json)
                 
             if not user.member.banned:
-                login(request, user)
+                login(request, user, backend="main_site.backends.DiscordIDBackend")
                 return redirect("/")
             else:
                 return render(request, self.template_name, {"banned": True, "search": True})
         
         return render(request, self.template_name, {"error": "Internal Server Error", "search": True})
 
-class IndexView(View):
+class IndexView(AnonymousPageCacheMixin, View):
     template_name = "index.html"
+    cache_tags = ("bots",)
+    fresh_fragments = ("fragments/random_bots.html",)
+
+    def get_fresh_context(self):
+        return {"random_bots": get_random_bots()}
 
     def get(self, request):
-        recent_bots = Bot.objects.filter(verified=True, banned=False, owner__banned=False).order_by('-date_added')[:8]
-        trending_bots = Bot.objects.filter(verified=True, banned=False, owner__banned=False).order_by('-votes')[:8]
+        recent_bots = Bot.objects.listed().for_cards().order_by('-date_added')[:8]
+        trending_bots = Bot.objects.listed().for_cards().order_by('-trending')[:8]
         return render(request, self.template_name, {
             "search": True,
-            "random_bots": get_random_bots(),
             "recent_bots": recent_bots,
-            "trending_bots": trending_bots
+            "trending_bots": trending_bots,
+            **self.get_fresh_context()
         })
 
-class BotListView(ListView, ResponseMixin):
+class BotListView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView, ResponseMixin):
     template_name = "bot_list.html"
     model = Bot
     paginate_by = 40
+    cache_tags = ("bots",)
     extra_context = {"search": True, "logo_off": True}
 
     def get_queryset(self):
-        return self.model.objects.filter(verified=True, banned=False, owner__banned=False).order_by('-votes')
+        return self.model.objects.listed().for_cards()
+
+    def put(self, request):
+        if not request.user.is_authenticated:
+            return self.json_response_401()
+        try:
+            bot = bot_votes.cast(request.user.member, int(QueryDict(request.body).get("bot_id")))
+        except AlreadyVoted:
+            return self.json_response_403()
+        except (TypeError, ValueError, Bot.DoesNotExist):
+            return self.json_response_404()
+        return JsonResponse({"vote_count": bot.votes})
+
+class SearchMixin(KeysetPaginationMixin):
+    """
+    Ranked full text search on ?q= with an optional ?tag= filter, tag only searches are ordered by votes.
+    The first page of a tag only search is served from the precomputed tag facets.
+    """
+    paginate_by = 40
+    search_backend = None
+    facets = None
+
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_keyset_key(self):
+        return "search_rank" if self.get_search_query() else "votes"
+
+    def get_queryset(self):
+        queryset = self.model.objects.listed().for_cards()
+        tag = self.request.GET.get("tag")
+        if tag:
+            queryset = queryset.filter(tags__name=tag)
+        query = self.get_search_query()
+        if query:
+            queryset = self.search_backend.search(queryset, query)
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        tag = self.request.GET.get("tag")
+        if tag and not self.get_search_query() and not self.request.GET.get(self.page_kwarg):
+            tag, rows = self.facets.top(tag, count=page_size)
+            if tag is not None:
+                paginator = KeysetPaginator(queryset, page_size, key=self.get_keyset_key())
+                has_next = rows and tag.listed_count > len(rows)
+                page = KeysetPage(rows, paginator, next_cursor=paginator.encode_cursor("after", rows[-1]) if has_next else None)
+                return paginator, page, rows, page.has_other_pages()
+        return super().paginate_queryset(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        query, tag = self.get_search_query(), self.request.GET.get("tag", "")
+        # Pager links carry both filters, the cursor only makes sense with the query it was made for
+        search_params = urlencode([(key, value) for key, value in (("q", query), ("tag", tag)) if value])
+        return super().get_context_data(search_query=query, search_tag=tag, search_params=search_params, **kwargs)
+
+class BotSearchView(SearchMixin, ListView):
+    template_name = "bot_search.html"
+    model = Bot
+    search_backend = bot_search
+    facets = bot_facets
+    extra_context = {"search": True, "logo_off": True}
 
 class BotAddView(LoginRequiredMixin, View):
     template_name = "bot_add.html"
@@ -181,21 +253,27 @@ class BotAddView(LoginRequiredMixin, View):
         
         if bot_id and int(bot_id) <= 9223372036854775807:
             if not Bot.objects.filter(id=bot_id).exists():
-                resp = discord_client.get_bot_info(bot_id)
-                if resp.status_code == 200:
-                    resp_data = resp.json()
-                    bot = Bot.objects.create(
-                        id=bot_id,
-                        name=resp_data.get("username"),
-                        owner=request.user.member,
-                        invite_link=data.get("invite"),
-                        date_added=datetime.now(timezone.utc),
-                        avatar=resp_data.get("avatar"),
-                        short_desc=data.get("short_desc")
-                    )
-                    bot.tags.set(BotTag.objects.filter(name__in=data.getlist('tags')))
-                    bot.meta.save()
-                    return render(request, "profile_page.html", {"member": request.user.member, "success": True})
+                try:
+                    resp_data = discord_users.get(bot_id)
+                except DiscordUserUnavailable:
+                    resp_data = None
+                if resp_data is not None:
+                    # The bot, its tags and meta and the log embed the save queues commit together
+                    with transaction.atomic():
+                        bot = Bot.objects.create(
+                            id=bot_id,
+                            name=resp_data.get("username"),
+                            owner=request.user.member,
+                            invite_link=data.get("invite"),
+                            date_added=datetime.now(timezone.utc),
+                            avatar=resp_data.get("avatar"),
+                            short_desc=data.get("short_desc")
+                        )
+                        bot.tags.set(BotTag.objects.filter(name__in=data.getlist('tags')))
+                        bot.meta.save()
+                    return render(request, "profile_page.html", {
+                        **get_profile_context(request, request.user.member), "success": True
+                    })
         return render(request, self.template_name, context)
 
 class ServerModerationView(LoginRequiredMixin, View, ResponseMixin):
@@ -206,9 +284,10 @@ class ServerModerationView(LoginRequiredMixin, View, ResponseMixin):
         try:
             server = Server.objects.get(id=server_id)
             server.verification_status = "UNDER_REVIEW"
-            server.meta.moderator = request.user.member
-            server.meta.save()
-            server.save()
+            with transaction.atomic():
+                server.meta.moderator = request.user.member
+                server.meta.save()
+                server.save()
             return redirect("staff_panel")
         except:
             return self.json_response_404()
@@ -225,21 +304,53 @@ class StaffView(LoginRequiredMixin, View, ResponseMixin):
             return render(request, self.template_name, context)
         return render(request, "404.html")
 
-class ServerIndexView(View, ResponseMixin):
+class ServerIndexView(AnonymousPageCacheMixin, View, ResponseMixin):
     template_name = "server_index.html"
+    cache_tags = ("servers",)
+    fresh_fragments = ("fragments/random_servers.html",)
+
+    def get_fresh_context(self):
+        return {"random_servers": get_random_servers()}
 
     def get(self, request):
         return render(request, self.template_name, {
-            "random_servers": get_random_servers(),
-            "recent_servers": Server.objects.filter(verified=True).order_by('-date_added')[:8],
-            "tags": get_server_tags()
+            "trending_servers": Server.objects.listed().for_cards().order_by('-trending')[:8],
+            "recent_servers": Server.objects.listed().for_cards().order_by('-date_added')[:8],
+            "tags": get_server_tags(),
+            **self.get_fresh_context()
         })
 
+    def put(self, request):
+        if not request.user.is_authenticated:
+            return self.json_response_401()
+        try:
+            server = server_votes.cast(request.user.member, int(QueryDict(request.body).get("server_id")))
+        except AlreadyVoted:
+            return self.json_response_403()
+        except (TypeError, ValueError, Server.DoesNotExist):
+            return self.json_response_404()
+        return JsonResponse({"vote_count": server.votes})
+
+class ServerListView(AnonymousPageCacheMixin, KeysetPaginationMixin, ListView, ResponseMixin):
+    template_name = "server_list.html"
+    model = Server
+    paginate_by = 40
+    cache_tags = ("servers",)
+
+    def get_queryset(self):
+        return self.model.objects.listed().for_cards()
+
+class ServerSearchView(SearchMixin, ListView):
+    template_name = "server_list.html"
+    model = Server
+    search_backend = server_search
+    facets = server_facets
+
 class ProfileView(LoginRequiredMixin, View):
     template_name = "profile_page.html"
     def get(self, request, user_id=None):
         try:
             member = Member.objects.get(id=user_id) if user_id else request.user.member
-            return render(request, self.template_name, {"member": member})
+            return render(request, self.template_name, get_profile_context(request, member))
         except:
             return render(request, "404.html")
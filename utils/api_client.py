@@ -1,18 +1,19 @@
 import json
 
-import requests
 from django.conf import settings
 
+from utils.http import discord_http
+
 
 class DiscordAPIClient:
     url = "https://discord.com/api/v8"
     headers = {"Authorization": f"Bot {settings.DISCORD_API_TOKEN}", "Content-Type": "application/json"}
 
     def get(self, endpoint):
-        return requests.get(self.url+endpoint, headers=self.headers)
+        return discord_http.get(self.url + endpoint, headers=self.headers)
 
     def post(self, endpoint, data: dict):
-        return requests.post(self.url + endpoint, headers=self.headers, json=data)
+        return discord_http.post(self.url + endpoint, headers=self.headers, json=data)
 
     def get_bot_info(self, bot_id):
         return self.get(f"/users/{bot_id}")
@@ -25,8 +26,22 @@ class DiscordAPIClient:
         if resp.status_code == 200:
             return resp.json().get("id")
 
-    def send_message(self, channel_id, message: str):
-        return self.post(f"/channels/{channel_id}/messages", data={"content": message})
-
-    def send_embed(self, embed: dict, channel_id=settings.LOG_CHANNEL_ID, ping=None):
-        return self.post(f"/channels/{channel_id}/messages", data={"embed": embed, "content": ping})
+    @staticmethod
+    def with_nonce(data: dict, nonce=None):
+        # enforce_nonce makes discord drop a retried message it has already accepted
+        if nonce is not None:
+            data.update(nonce=nonce, enforce_nonce=True)
+        return data
+
+    def send_message(self, channel_id, message: str, nonce=None):
+        return self.post(f"/channels/{channel_id}/messages", data=self.with_nonce({"content": message}, nonce))
+
+    def send_embed(self, embed: dict, channel_id=settings.LOG_CHANNEL_ID, ping=None, nonce=None):
+        return self.post(
+            f"/channels/{channel_id}/messages", data=self.with_nonce({"embed": embed, "content": ping}, nonce)
+        )
+
+    def send_embeds(self, embeds: list, channel_id=settings.LOG_CHANNEL_ID, ping=None, nonce=None):
+        return self.post(
+            f"/channels/{channel_id}/messages", data=self.with_nonce({"embeds": embeds, "content": ping}, nonce)
+        )
@@ -0,0 +1,154 @@
+import json
+import asyncio
+
+import aiohttp
+from django.conf import settings
+
+from utils.http import RateLimited, discord_http, route_key
+from utils.api_client import DiscordAPIClient
+
+
+class AsyncResponse:
+    """
+    The parts of requests.Response the callers use, read eagerly so it outlives the connection.
+    """
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = body
+
+    @property
+    def text(self):
+        return self.content.decode(errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncDiscordHTTPClient:
+    """
+    asyncio twin of DiscordHTTPClient. Rate limit buckets and the circuit breaker are the sync
+    client's objects, so sync and async callers in one process stay under the same limits.
+    At most `concurrency` requests are in flight at once.
+    """
+
+    def __init__(self, sync_client=discord_http, concurrency=50, timeout=15):
+        self.sync_client = sync_client
+        self.limiter = sync_client.limiter
+        self.breaker = sync_client.breaker
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.semaphore = None
+        self.loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def ensure_session(self):
+        # aiohttp sessions are bound to the running loop, a new asyncio.run() gets a new one
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.loop is not loop:
+            self.loop = loop
+            self.session = aiohttp.ClientSession(
+                timeout=self.timeout, connector=aiohttp.TCPConnector(limit=self.concurrency)
+            )
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def request(self, method, url, **kwargs):
+        session = self.ensure_session()
+        route = route_key(method, url)
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            route = route[:2] + (route[2] + (hash(authorization),),)
+        async with self.semaphore:
+            for attempt in range(self.sync_client.max_retries + 1):
+                self.breaker.check()
+                delay = self.limiter.reserve(route)
+                if delay > self.sync_client.max_wait:
+                    raise RateLimited(f"Rate limited on {route[1]} for {delay:.1f}s.")
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    async with session.request(method, url, **kwargs) as raw:
+                        response = AsyncResponse(raw.status, raw.headers, await raw.read())
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    self.breaker.record(success=False)
+                    raise
+                self.breaker.record(success=response.status_code < 500)
+                self.limiter.update(route, response)
+                if response.status_code != 429 or attempt == self.sync_client.max_retries:
+                    return response
+                retry_after = self.limiter.retry_after(response)
+                if retry_after > self.sync_client.max_wait:
+                    return response
+                await asyncio.sleep(retry_after)
+            return response
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+class AsyncDiscordAPIClient:
+    url = DiscordAPIClient.url
+    headers = DiscordAPIClient.headers
+    with_nonce = staticmethod(DiscordAPIClient.with_nonce)
+
+    def __init__(self, concurrency=50):
+        self.http = AsyncDiscordHTTPClient(concurrency=concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http.close()
+
+    async def get(self, endpoint):
+        return await self.http.get(self.url + endpoint, headers=self.headers)
+
+    async def post(self, endpoint, data: dict):
+        return await self.http.post(self.url + endpoint, headers=self.headers, json=data)
+
+    async def get_bot_info(self, bot_id):
+        return await self.get(f"/users/{bot_id}")
+
+    async def get_guild_info(self, guild_id):
+        return await self.get(f"/guilds/{guild_id}")
+
+    async def create_dm_channel(self, user_id):
+        resp = await self.post("/users/@me/channels", data={"recipient_id": user_id})
+        if resp.status_code == 200:
+            return resp.json().get("id")
+
+    async def send_message(self, channel_id, message: str, nonce=None):
+        return await self.post(f"/channels/{channel_id}/messages", data=self.with_nonce({"content": message}, nonce))
+
+    async def send_embed(self, embed: dict, channel_id=settings.LOG_CHANNEL_ID, ping=None, nonce=None):
+        return await self.post(
+            f"/channels/{channel_id}/messages", data=self.with_nonce({"embed": embed, "content": ping}, nonce)
+        )
+
+    async def send_embeds(self, embeds: list, channel_id=settings.LOG_CHANNEL_ID, ping=None, nonce=None):
+        return await self.post(
+            f"/channels/{channel_id}/messages", data=self.with_nonce({"embeds": embeds, "content": ping}, nonce)
+        )
+
+    async def fan_out(self, method, items):
+        """
+        Runs `method(item)` for every item concurrently, returns {item: response or exception}.
+        """
+        results = await asyncio.gather(*(method(item) for item in items), return_exceptions=True)
+        return dict(zip(items, results))
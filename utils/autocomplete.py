@@ -0,0 +1,143 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.db import close_old_connections
+
+from main_site.models import Bot, Server
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """
+    Sorted array of lowercased listed names answering prefix lookups with two bisects.
+    Top results of the very short (and therefore very wide) prefixes are precomputed so
+    every keystroke stays well under a millisecond. Kept in sync from the save signals and
+    reloaded every `ttl` seconds to pick up vote changes and writes of other workers.
+    Only the very first load blocks, later reloads run on one background thread while
+    lookups keep reading the previous arrays.
+    """
+
+    def __init__(self, model, limit=10, cached_prefix_length=2, ttl=600):
+        self.model = model
+        self.limit = limit
+        self.cached_prefix_length = cached_prefix_length
+        self.ttl = ttl
+        self.entries = []
+        self.names = {}
+        self.top = {}
+        self.ready = False
+        self.loaded_at = None
+        # Bumped by invalidate(), a load only clears the invalidations made before it read the rows
+        self.version = 0
+        self.loaded_version = 0
+        # Saves seen while a load runs, replayed on top of its arrays, None outside of loads
+        self.missed = None
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+
+    @staticmethod
+    def entry(pk, name, votes):
+        return name.lower(), -votes, pk, name
+
+    def rows(self):
+        return self.model.objects.listed().values_list("id", "name", "votes").iterator()
+
+    def load(self):
+        with self.lock:
+            self.missed = {}
+            version = self.version
+        try:
+            entries = [self.entry(pk, name, votes) for pk, name, votes in self.rows() if name]
+            # One sort() of the whole list holds the GIL for ~100ms at 100k names and stalls the
+            # lookups of the other threads, sorted chunks merged in python keep every pause short
+            chunks = [sorted(entries[start:start + 5000]) for start in range(0, len(entries), 5000)]
+            entries = list(heapq.merge(*chunks))
+            names = {entry[2]: entry for entry in entries}
+            top = {}
+            for length in range(1, self.cached_prefix_length + 1):
+                for prefix in {entry[0][:length] for entry in entries}:
+                    top[prefix] = self.scan(prefix, entries)
+            with self.lock:
+                self.entries, self.names, self.top = entries, names, top
+                for pk, entry in self.missed.items():
+                    self.apply(pk, entry)
+                self.ready = True
+                self.loaded_at = time.monotonic()
+                self.loaded_version = version
+        finally:
+            with self.lock:
+                self.missed = None
+
+    def reload(self):
+        try:
+            close_old_connections()
+            self.load()
+        except Exception:
+            logger.exception("Reloading the %s name index failed", self.model._meta.model_name)
+        finally:
+            close_old_connections()
+            self.reload_lock.release()
+
+    def invalidate(self):
+        with self.lock:
+            self.version += 1
+
+    def ensure_loaded(self):
+        if not self.ready:
+            # Nothing to serve yet, concurrent callers wait for the one that loads
+            with self.reload_lock:
+                if not self.ready:
+                    self.load()
+        elif self.loaded_version != self.version or time.monotonic() - self.loaded_at > self.ttl:
+            if self.reload_lock.acquire(blocking=False):
+                threading.Thread(target=self.reload, name=f"{self.model._meta.model_name}-names", daemon=True).start()
+
+    def scan(self, prefix, entries=None):
+        entries = self.entries if entries is None else entries
+        start = bisect_left(entries, (prefix,))
+        end = bisect_left(entries, (prefix + "\uffff",), lo=start)
+        best = heapq.nsmallest(self.limit, entries[start:end], key=lambda entry: (entry[1], entry[0]))
+        return [{"id": str(pk), "name": name, "votes": -votes} for _, votes, pk, name in best]
+
+    def refresh_prefixes(self, name):
+        for length in range(1, min(len(name), self.cached_prefix_length) + 1):
+            prefix = name[:length]
+            self.top[prefix] = self.scan(prefix)
+
+    def apply(self, pk, new):
+        old = self.names.pop(pk, None)
+        if old is not None:
+            index = bisect_left(self.entries, old)
+            if index < len(self.entries) and self.entries[index] == old:
+                del self.entries[index]
+            self.refresh_prefixes(old[0])
+        if new is not None:
+            insort(self.entries, new)
+            self.names[pk] = new
+            self.refresh_prefixes(new[0])
+
+    def update(self, instance):
+        new = self.entry(instance.pk, instance.name, instance.votes) if instance.is_listed and instance.name else None
+        with self.lock:
+            if self.missed is not None:
+                self.missed[instance.pk] = new
+            if self.ready:
+                self.apply(instance.pk, new)
+
+    def complete(self, prefix):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        self.ensure_loaded()
+        with self.lock:
+            if len(prefix) <= self.cached_prefix_length:
+                return self.top.get(prefix, [])
+            return self.scan(prefix)
+
+
+bot_names = PrefixIndex(Bot)
+server_names = PrefixIndex(Server)
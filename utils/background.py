@@ -1,24 +1,26 @@
 from datetime import datetime, timezone, timedelta
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, m2m_changed
 from rest_framework.authtoken.models import Token
 
-from main_site.models import Member, Bot, BotMeta, MemberMeta, Server, ServerMeta
-from utils.hashing import Hasher
-from utils.api_client import DiscordAPIClient
+from main_site.models import Member, Bot, BotMeta, BotTag, MemberMeta, Server, ServerMeta, ServerTag
 from utils.embedhandler import EmbedHandler
+from utils import outbox, page_cache
+from utils.autocomplete import bot_names, server_names
+from utils.facets import bot_facets, server_facets
+from utils.counters import bot_invites, server_invites
+from utils.sampler import bot_sampler, server_sampler
+from utils.search import bot_search, server_search
+from utils.timeseries import bot_series, server_series
 
-hasher = Hasher()
 embed = EmbedHandler()
-api_client = DiscordAPIClient()
 
 
 def create_user(user_json, api=False):
     user_id = user_json.get("id")
-    user = User.objects.create_user(username=user_id,
-                                    password=hasher.get_hashed_pass(user_id),
-                                    first_name=user_json.get("username"))
+    # No usable password, members only log in through discord
+    user = User.objects.create_user(username=user_id, password=None, first_name=user_json.get("username"))
     member = Member.objects.create(id=user_id,
                                    user=user,
                                    avatar=user_json.get("avatar"),
@@ -35,6 +37,7 @@ def create_user(user_json, api=False):
 
 
 def update_user(user, user_json):
+    renamed = user.first_name != user_json.get("username")
     user.first_name = user_json.get("username")
     user.member.avatar = user_json.get("avatar")
     user.member.tag = user_json.get("discriminator")
@@ -46,6 +49,8 @@ def update_user(user, user_json):
     user.member.meta.save()
     user.member.sync_servers()
     user.save()
+    if renamed:
+        invalidate_owner_pages(user.member)
 
 
 @receiver(post_save, sender=Bot)
@@ -66,6 +71,139 @@ def create_member_meta(sender, instance, created, **kwargs):
         MemberMeta.objects.create(member=instance)
 
 
+def invalidate_owner_pages(member):
+    page_cache.invalidate(*[f"bot:{bot_id}" for bot_id in member.bots.values_list("id", flat=True)])
+
+
+@receiver(post_save, sender=Member)
+def sync_listings_on_member_change(sender, instance, created, **kwargs):
+    # Logins and dm_channel writes save members too, only a ban or a new avatar/tag concerns the listings
+    if created:
+        return
+    before, after = getattr(instance, "saved_profile_state", None), instance.profile_state()
+    if before is not None and before == after:
+        return
+    if before is None or after is None or before[0] != after[0]:
+        bots, servers = instance.sync_listings()
+        if bots:
+            bot_sampler.invalidate()
+            bot_names.invalidate()
+            bot_facets.refresh(BotTag.objects.filter(bots__owner=instance).distinct())
+            page_cache.invalidate("bots")
+        if servers:
+            server_sampler.invalidate()
+            server_names.invalidate()
+            server_facets.refresh(ServerTag.objects.filter(attached_servers__owner=instance).distinct())
+            page_cache.invalidate("servers")
+    invalidate_owner_pages(instance)
+
+
+@receiver(post_save, sender=Bot)
+def update_bot_sampler(sender, instance, **kwargs):
+    bot_sampler.update(instance)
+    bot_names.update(instance)
+
+
+@receiver(post_save, sender=Server)
+def update_server_sampler(sender, instance, **kwargs):
+    server_sampler.update(instance)
+    server_names.update(instance)
+
+
+@receiver(post_save, sender=Bot)
+@receiver(post_save, sender=BotMeta)
+def invalidate_bot_pages(sender, instance, **kwargs):
+    bot_id = instance.bot_id if sender is BotMeta else instance.id
+    page_cache.invalidate("bots", f"bot:{bot_id}")
+
+
+@receiver(post_save, sender=Bot)
+def forget_bot_invite_link(sender, instance, **kwargs):
+    bot_invites.forget(instance.id)
+
+
+@receiver(post_save, sender=Server)
+def forget_server_invite_link(sender, instance, **kwargs):
+    server_invites.forget(instance.id)
+
+
+@receiver(post_save, sender=Server)
+@receiver(post_save, sender=ServerMeta)
+def invalidate_server_pages(sender, instance, **kwargs):
+    server_id = instance.server_id if sender is ServerMeta else instance.id
+    page_cache.invalidate("servers", f"server:{server_id}")
+
+
+@receiver(m2m_changed, sender=Bot.tags.through)
+def invalidate_bot_pages_on_tag_change(sender, instance, **kwargs):
+    if isinstance(instance, Bot):
+        page_cache.invalidate("bots", f"bot:{instance.id}")
+    else:
+        page_cache.invalidate("bots")
+
+
+@receiver(m2m_changed, sender=Server.tags.through)
+def invalidate_server_pages_on_tag_change(sender, instance, **kwargs):
+    if isinstance(instance, Server):
+        page_cache.invalidate("servers", f"server:{instance.id}")
+    else:
+        page_cache.invalidate("servers")
+
+
+@receiver(post_save, sender=Bot)
+@receiver(post_save, sender=BotMeta)
+def index_bot_for_search(sender, instance, **kwargs):
+    bot_search.index(instance.bot_id if sender is BotMeta else instance.id)
+
+
+@receiver(post_save, sender=Server)
+@receiver(post_save, sender=ServerMeta)
+def index_server_for_search(sender, instance, **kwargs):
+    server_search.index(instance.server_id if sender is ServerMeta else instance.id)
+
+
+@receiver(post_save, sender=Bot)
+def refresh_bot_tag_facets(sender, instance, created, **kwargs):
+    bot_facets.on_save(instance, created)
+
+
+@receiver(post_save, sender=Server)
+def refresh_server_tag_facets(sender, instance, created, **kwargs):
+    server_facets.on_save(instance, created)
+
+
+@receiver(m2m_changed, sender=Bot.tags.through)
+def refresh_bot_tag_facets_on_tag_change(sender, instance, action, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        if isinstance(instance, Bot):
+            bot_facets.refresh_names(pk_set)
+        else:
+            bot_facets.refresh([instance])
+    elif action == "post_clear":
+        bot_facets.refresh_all()
+
+
+@receiver(m2m_changed, sender=Server.tags.through)
+def refresh_server_tag_facets_on_tag_change(sender, instance, action, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        if isinstance(instance, Server):
+            server_facets.refresh_names(pk_set)
+        else:
+            server_facets.refresh([instance])
+    elif action == "post_clear":
+        server_facets.refresh_all()
+
+
+@receiver(post_save, sender=BotTag)
+def invalidate_bot_tag_pages(sender, instance, **kwargs):
+    page_cache.invalidate("bots")
+
+
+@receiver(post_save, sender=ServerTag)
+def invalidate_server_tag_pages(sender, instance, **kwargs):
+    page_cache.invalidate("servers")
+
+
 @receiver(post_save, sender=User)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
@@ -75,73 +213,92 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
 @receiver(post_save, sender=Bot)
 def alert_with_webhook_on_bot_change(sender, instance=None, created=False, **kwargs):
     if created:
-        instance.owner.send_message(
+        outbox.dm(
+            instance.owner,
             f"<:botadded:652482091971248140> Your bot {instance.name} is added and is currently awaiting verification."
         )
-        api_client.send_embed(embed=instance.embed(status="added"), ping="<@&645283184606707742>")
+        outbox.embed(instance.embed(status="added"), ping="<@&645283184606707742>")
 
     elif kwargs['update_fields']:
         if "banned" in kwargs['update_fields']:
             if instance.banned:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botdeclined:652482092499730433> "
                     f"Your bot {instance.name} got banned for the reason: {instance.meta.ban_reason}"
                 )
-                api_client.send_embed(embed=instance.embed(status="banned"))
+                outbox.embed(instance.embed(status="banned"))
             else:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botadded:652482091971248140> "
                     f"Your bot {instance.name} is unbanned"
                 )
-                api_client.send_embed(embed=instance.embed(status="unbanned"))
+                outbox.embed(instance.embed(status="unbanned"))
 
         elif "verification_status" in kwargs["update_fields"]:
             if instance.verification_status == "REJECTED":
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botdeclined:652482092499730433> "
                     f"Your bot {instance.name} is rejected for the reason: {instance.meta.rejection_reason}"
                 )
-                api_client.send_embed(embed=instance.embed(status="rejected"))
+                outbox.embed(instance.embed(status="rejected"))
             else:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botadded:652482091971248140> Your bot {instance.name} is verified and is now public."
                 )
-                api_client.send_embed(embed=instance.embed(status="verified"))
+                outbox.embed(instance.embed(status="verified"))
 
 
 @receiver(post_save, sender=Server)
 def alert_with_webhook_on_server_change(sender, instance=None, created=False, **kwargs):
     if created:
-        instance.owner.send_message(
+        outbox.dm(
+            instance.owner,
             f"<:botadded:652482091971248140> "
             f"Your server {instance.name} is added and is currently awaiting verification."
         )
-        api_client.send_embed(embed=instance.embed(status="added"), ping="<@&645283184606707742>")
+        outbox.embed(instance.embed(status="added"), ping="<@&645283184606707742>")
 
     elif kwargs['update_fields']:
         if "banned" in kwargs['update_fields']:
             if instance.banned:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botdeclined:652482092499730433> "
                     f"Your server {instance.name} got banned for the reason: {instance.meta.ban_reason}"
                 )
-                api_client.send_embed(embed=instance.embed(status="banned"))
+                outbox.embed(instance.embed(status="banned"))
             else:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botadded:652482091971248140> "
                     f"Your server {instance.name} is unbanned"
                 )
-                api_client.send_embed(embed=instance.embed(status="unbanned"
-                                                                  ""))
+                outbox.embed(instance.embed(status="unbanned"))
         elif "verification_status" in kwargs["update_fields"]:
             if instance.verification_status == "REJECTED":
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botdeclined:652482092499730433> "
                     f"Your server {instance.name} is rejected for the reason: {instance.meta.rejection_reason}"
                 )
-                api_client.send_embed(embed=instance.embed(status="rejected"))
+                outbox.embed(instance.embed(status="rejected"))
             else:
-                instance.owner.send_message(
+                outbox.dm(
+                    instance.owner,
                     f"<:botadded:652482091971248140> Your server {instance.name} is verified and is now public."
                 )
-                api_client.send_embed(embed=instance.embed(status="verified"))
\ No newline at end of file
+                outbox.embed(instance.embed(status="verified"))
+
+
+@receiver(post_delete, sender=Bot)
+def forget_bot_stat_series(sender, instance, **kwargs):
+    bot_series.forget(instance.pk)
+
+
+@receiver(post_delete, sender=Server)
+def forget_server_stat_series(sender, instance, **kwargs):
+    server_series.forget(instance.pk)
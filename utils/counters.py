@@ -0,0 +1,88 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+from main_site.models import Bot, BotMeta, Server, ServerMeta
+
+logger = logging.getLogger(__name__)
+
+
+class InviteCounter:
+    """
+    Buffers invite clicks in memory and writes them with one F() UPDATE per bot/server
+    every `interval` seconds, so the invite redirect never writes to the database.
+    Pending clicks are flushed at interpreter exit.
+    """
+
+    def __init__(self, model, meta_model, interval=30, link_timeout=300):
+        self.model = model
+        self.meta_model = meta_model
+        self.fk_field = model._meta.model_name
+        self.interval = interval
+        self.link_timeout = link_timeout
+        self.pending = Counter()
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def link_key(self, pk):
+        return f"invite-link:{self.fk_field}:{pk}"
+
+    def get_invite_link(self, pk):
+        link = cache.get(self.link_key(pk))
+        if link is None:
+            link = self.model.objects.filter(id=pk).values_list("invite_link", flat=True).first()
+            if link is not None:
+                cache.set(self.link_key(pk), link, self.link_timeout)
+        return link
+
+    def forget(self, pk):
+        cache.delete(self.link_key(pk))
+
+    def hit(self, pk):
+        with self.lock:
+            self.pending[int(pk)] += 1
+            if self.flusher is None:
+                self.start()
+
+    def start(self):
+        self.flusher = threading.Thread(target=self.run, name=f"{self.fk_field}-invite-flusher", daemon=True)
+        self.flusher.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        event = threading.Event()
+        while not event.wait(self.interval):
+            # The flusher owns its connection, drop it when it outlived CONN_MAX_AGE or broke
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing %s invite clicks failed", self.fk_field)
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                for pk, count in sorted(pending.items()):
+                    self.meta_model.objects.filter(**{f"{self.fk_field}_id": pk}).update(
+                        total_invites=Coalesce(F("total_invites"), Value(0)) + count
+                    )
+        except Exception:
+            with self.lock:
+                self.pending.update(pending)
+            raise
+
+
+bot_invites = InviteCounter(Bot, BotMeta)
+server_invites = InviteCounter(Server, ServerMeta)
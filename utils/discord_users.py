@@ -0,0 +1,92 @@
+import asyncio
+
+import requests
+from django.core.cache import caches
+
+from utils.api_client import DiscordAPIClient
+from utils.async_api_client import AsyncDiscordAPIClient
+
+api_client = DiscordAPIClient()
+
+
+class DiscordUserUnavailable(Exception):
+    pass
+
+
+class DiscordUserCache:
+    """
+    Read-through cache of discord user objects in the shared django cache. Unknown users (404)
+    are cached as well, for a shorter time, so resubmits of a bad id don't reach discord either.
+    Transient failures are never cached.
+    """
+    NOT_FOUND = "not-found"
+
+    def __init__(self, alias="default", ttl=3600, negative_ttl=300, concurrency=20):
+        self.alias = alias
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.concurrency = concurrency
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(user_id):
+        return f"discord-user:{user_id}"
+
+    def store(self, user_id, response):
+        if response.status_code == 200:
+            user = response.json()
+            self.cache.set(self.key(user_id), user, self.ttl)
+            return user
+        if response.status_code == 404:
+            self.cache.set(self.key(user_id), self.NOT_FOUND, self.negative_ttl)
+            return None
+        raise DiscordUserUnavailable(f"Discord responded {response.status_code}")
+
+    def get(self, user_id):
+        """
+        The user object, None when discord doesn't know the id.
+        Raises DiscordUserUnavailable when discord can't be reached.
+        """
+        cached = self.cache.get(self.key(user_id))
+        if cached is not None:
+            return None if cached == self.NOT_FOUND else cached
+        try:
+            return self.store(user_id, api_client.get_bot_info(user_id))
+        except requests.RequestException as error:
+            raise DiscordUserUnavailable(str(error)) from error
+
+    async def fetch(self, user_ids):
+        async with AsyncDiscordAPIClient(concurrency=self.concurrency) as client:
+            return await client.fan_out(client.get_bot_info, user_ids)
+
+    def get_many(self, user_ids):
+        """
+        {id: user object or None} for every id that could be resolved, misses are fetched concurrently.
+        """
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        cached = self.cache.get_many([self.key(user_id) for user_id in user_ids])
+        users, missing = {}, []
+        for user_id in user_ids:
+            value = cached.get(self.key(user_id))
+            if value is None:
+                missing.append(user_id)
+            else:
+                users[user_id] = None if value == self.NOT_FOUND else value
+        if missing:
+            for user_id, response in asyncio.run(self.fetch(missing)).items():
+                if isinstance(response, Exception):
+                    continue
+                try:
+                    users[user_id] = self.store(user_id, response)
+                except DiscordUserUnavailable:
+                    pass
+        return users
+
+    def invalidate(self, user_id):
+        self.cache.delete(self.key(user_id))
+
+
+discord_users = DiscordUserCache()
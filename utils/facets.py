@@ -0,0 +1,100 @@
+from django.db.models import F
+
+from main_site.models import Bot, BotTag, Server, ServerTag
+
+
+class TagFacets:
+    """
+    Keeps listed_count and the top `size` ids by votes and by trending on each tag row, so tag
+    chips and the first page of a tag are read without the join-and-sort through the m2m table.
+    Saves are applied incrementally: listed_count moves by one when the listing status flips,
+    and a top list is only recomputed when the entity can enter or leave it. Saves that don't
+    change is_listed, votes or trending cost nothing. Tag changes recompute the affected tags.
+    """
+
+    def __init__(self, tag_model, model, relation, size=40):
+        self.tag_model = tag_model
+        self.model = model
+        self.relation = relation
+        self.size = size
+
+    def refresh(self, tags, count=True):
+        for tag in tags:
+            listed = getattr(tag, self.relation).listed()
+            top_voted = list(listed.order_by("-votes", "-id").values_list("id", "votes")[:self.size])
+            top_trending = list(listed.order_by("-trending", "-id").values_list("id", "trending")[:self.size])
+            tag.top_voted = [pk for pk, _ in top_voted]
+            tag.top_trending = [pk for pk, _ in top_trending]
+            tag.votes_floor = top_voted[-1][1] if len(top_voted) == self.size else None
+            tag.trending_floor = top_trending[-1][1] if len(top_trending) == self.size else None
+            fields = ["top_voted", "top_trending", "votes_floor", "trending_floor"]
+            if count:
+                tag.listed_count = listed.count()
+                fields.append("listed_count")
+            tag.save(update_fields=fields)
+
+    def refresh_all(self):
+        self.refresh(self.tag_model.objects.all())
+
+    def refresh_for(self, pk):
+        self.refresh(self.tag_model.objects.filter(**{self.relation: pk}))
+
+    def refresh_names(self, names):
+        self.refresh(self.tag_model.objects.filter(name__in=names))
+
+    @staticmethod
+    def can_enter(tag, target):
+        return (
+            target.id not in tag.top_voted and (tag.votes_floor is None or target.votes > tag.votes_floor)
+            or target.id not in tag.top_trending
+            and (tag.trending_floor is None or target.trending > tag.trending_floor)
+        )
+
+    @staticmethod
+    def can_leave(tag, target, votes, trending):
+        # A full list can lose a member whose score dropped, one that isn't full holds every listing
+        return (
+            target.id in tag.top_voted and tag.votes_floor is not None and target.votes < votes
+            or target.id in tag.top_trending and tag.trending_floor is not None and target.trending < trending
+        )
+
+    def on_vote(self, target):
+        self.refresh([
+            tag for tag in self.tag_model.objects.filter(**{self.relation: target.id}) if self.can_enter(tag, target)
+        ], count=False)
+
+    def on_save(self, target, created=False):
+        previous = (False, 0, 0.0) if created else getattr(target, "saved_listing_state", None)
+        current = target.listing_state()
+        if previous is None or current is None:
+            return self.refresh_for(target.id)
+        if current == previous:
+            return
+        was_listed, votes, trending = previous
+        tags = list(self.tag_model.objects.filter(**{self.relation: target.id}))
+        if target.is_listed != was_listed:
+            self.tag_model.objects.filter(pk__in=[tag.pk for tag in tags]).update(
+                listed_count=F("listed_count") + (1 if target.is_listed else -1)
+            )
+        if target.is_listed:
+            stale = [tag for tag in tags if self.can_enter(tag, target) or self.can_leave(tag, target, votes, trending)]
+        else:
+            stale = [tag for tag in tags if target.id in tag.top_voted or target.id in tag.top_trending]
+        self.refresh(stale, count=False)
+
+    def top(self, name, order="votes", count=None):
+        """
+        Best listed entities of a tag, (None, []) when the tag doesn't exist.
+        """
+        tag = self.tag_model.objects.filter(name=name).first()
+        if tag is None:
+            return None, []
+        ids = tag.top_voted if order == "votes" else tag.top_trending
+        objects = self.model.objects.listed().for_cards().in_bulk(ids).values()
+        # Votes inside the top list don't trigger a refresh, the live values give the exact order
+        ranked = sorted(objects, key=lambda obj: (getattr(obj, order), obj.id), reverse=True)
+        return tag, ranked[:count or self.size]
+
+
+bot_facets = TagFacets(BotTag, Bot, "bots")
+server_facets = TagFacets(ServerTag, Server, "attached_servers")
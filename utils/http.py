@@ -0,0 +1,185 @@
+import re
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAJOR_PARAMETER = re.compile(r"/(channels|guilds|webhooks)/(\d+)")
+SNOWFLAKE = re.compile(r"/\d{15,}")
+
+
+class CircuitOpen(requests.ConnectionError):
+    pass
+
+
+class RateLimited(requests.ConnectionError):
+    pass
+
+
+def route_key(method, url):
+    """
+    Discord rate limits per route with the channel/guild/webhook id as part of the route,
+    every other id is folded so /users/1 and /users/2 share a bucket.
+    """
+    path = url.split("/api/", 1)[-1].split("?", 1)[0]
+    majors = MAJOR_PARAMETER.findall(path)
+    path = SNOWFLAKE.sub("/:id", MAJOR_PARAMETER.sub(r"/\1/:major", path))
+    return method.upper(), path, tuple(major for _, major in majors)
+
+
+class RateLimiter:
+    """
+    Tracks the X-RateLimit-* headers per route bucket plus the global limit and tells
+    callers how long to wait before their next request on a route.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.route_buckets = {}
+        self.global_reset = 0.0
+        self.lock = threading.Lock()
+
+    def bucket_for(self, route):
+        # Routes share a bucket id when discord says so, the major parameters still split them
+        bucket = self.route_buckets.get(route[:2])
+        return (bucket, route[2]) if bucket else route
+
+    def reserve(self, route):
+        """
+        Takes one request from the route's bucket, returns the seconds to sleep before sending it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            delay = max(self.global_reset - now, 0.0)
+            state = self.buckets.get(self.bucket_for(route))
+            if state is not None:
+                if now >= state["reset"]:
+                    state["remaining"] = state["limit"]
+                    state["reset"] = now + state["window"]
+                if state["remaining"] <= 0:
+                    # Queue into the next window, reset may already be several windows ahead
+                    state["remaining"] = state["limit"]
+                    state["reset"] += state["window"]
+                state["remaining"] -= 1
+                delay = max(delay, state["reset"] - state["window"] - now)
+            return delay
+
+    def update(self, route, response):
+        headers = response.headers
+        with self.lock:
+            now = time.monotonic()
+            if response.status_code == 429:
+                retry_after = self.retry_after(response)
+                if headers.get("X-RateLimit-Global") or headers.get("X-RateLimit-Scope") == "global":
+                    self.global_reset = max(self.global_reset, now + retry_after)
+            if "X-RateLimit-Limit" not in headers:
+                return
+            if "X-RateLimit-Bucket" in headers:
+                self.route_buckets[route[:2]] = headers["X-RateLimit-Bucket"]
+            try:
+                window = float(headers.get("X-RateLimit-Reset-After", 1))
+                self.buckets[self.bucket_for(route)] = {
+                    "limit": int(headers["X-RateLimit-Limit"]),
+                    "remaining": int(headers.get("X-RateLimit-Remaining", 0)),
+                    "reset": now + window,
+                    "window": max(window, 0.001),
+                }
+            except ValueError:
+                pass
+
+    @staticmethod
+    def retry_after(response):
+        try:
+            return float(response.json().get("retry_after"))
+        except (ValueError, TypeError, AttributeError):
+            return float(response.headers.get("Retry-After", 1))
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive connection errors or 5xx responses and fails fast
+    for `cooldown` seconds, then lets a single trial request through.
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def check(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown:
+                raise CircuitOpen("Discord is failing, not sending requests for a while.")
+            # Half open, the next failure reopens it right away
+            self.opened_at = None
+            self.failures = self.threshold - 1
+
+    def record(self, success):
+        with self.lock:
+            if success:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class DiscordHTTPClient:
+    """
+    Keep-alive session shared by every Discord caller in the process, requests wait for their
+    rate limit bucket instead of being rejected and 429s are retried after the advertised delay.
+    """
+
+    def __init__(self, pool_size=20, timeout=(5, 15), max_retries=3, max_wait=10):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.limiter = RateLimiter()
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        route = route_key(method, url)
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            # OAuth routes are limited per user token, not per application
+            route = route[:2] + (route[2] + (hash(authorization),),)
+        for attempt in range(self.max_retries + 1):
+            self.breaker.check()
+            delay = self.limiter.reserve(route)
+            if delay > self.max_wait:
+                raise RateLimited(f"Rate limited on {route[1]} for {delay:.1f}s.")
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.breaker.record(success=False)
+                raise
+            self.breaker.record(success=response.status_code < 500)
+            self.limiter.update(route, response)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            retry_after = self.limiter.retry_after(response)
+            if retry_after > self.max_wait:
+                return response
+            time.sleep(retry_after)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+discord_http = DiscordHTTPClient()
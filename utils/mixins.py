@@ -6,6 +6,7 @@ class Response:
 
     code_200 = {"response": "200", "message": "Ok"}
     code_201 = {"response": "201", "message": "Created"}
+    code_202 = {"response": "202", "message": "Accepted"}
     code_204 = {"response": "204", "message": "No Content"}
     code_400 = {"response": "400", "message": "Bad Request"}
     code_401 = {"response": "401", "message": "Unauthorized"}
@@ -29,6 +30,10 @@ class ResponseMixin(object):
     def json_response_201():
         return JsonResponse(Response.code_201, status=201)
 
+    @staticmethod
+    def json_response_202():
+        return JsonResponse(Response.code_202, status=202)
+
     @staticmethod
     def json_response_204():
         return JsonResponse(Response.code_204, status=204)
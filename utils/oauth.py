@@ -1,6 +1,7 @@
-import requests
 from django.conf import settings
 
+from utils.http import discord_http
+
 
 class Oauth:
     redirect_uri = settings.AUTH_CALLBACK_URL
@@ -21,7 +22,7 @@ class Oauth:
 
     def post(self, endpoint, payload):
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        return requests.post(url=self.discord_api_url+endpoint, data=payload, headers=headers)
+        return discord_http.post(url=self.discord_api_url+endpoint, data=payload, headers=headers)
 
     def get_token_json(self, code):
         data = {
@@ -38,7 +39,7 @@ class Oauth:
     @staticmethod
     def get(access_token, endpoint):
         headers = {"Authorization": f"Bearer {access_token}"}
-        response_object = requests.get(url=endpoint, headers=headers)
+        response_object = discord_http.get(url=endpoint, headers=headers)
         return response_object.json()
 
     def get_user_json(self, access_token):
@@ -0,0 +1,154 @@
+import json
+import hashlib
+from datetime import timedelta
+from itertools import groupby
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from main_site.models import Member, OutboxMessage
+from utils.api_client import DiscordAPIClient
+
+api_client = DiscordAPIClient()
+
+MAX_ATTEMPTS = 8
+MAX_BACKOFF = timedelta(minutes=30)
+CLAIM_TIMEOUT = timedelta(minutes=2)
+# Log channel embeds wait this long for company, discord takes 10 embeds and 6000 characters per message
+EMBED_BATCH_WINDOW = timedelta(seconds=3)
+MAX_EMBEDS = 10
+MAX_EMBED_CHARACTERS = 6000
+
+
+class PermanentFailure(Exception):
+    pass
+
+
+def dm(member, message):
+    """
+    Queues a direct message, written on the caller's connection so it commits
+    or rolls back together with the change that triggered it.
+    """
+    return OutboxMessage.objects.create(kind="DM", recipient_id=member.id, payload={"content": message})
+
+
+def embed(embed_data, channel_id=settings.LOG_CHANNEL_ID, ping=None):
+    return OutboxMessage.objects.create(
+        kind="EMBED", recipient_id=channel_id, payload={"embed": embed_data, "content": ping},
+        next_attempt_at=timezone.now() + EMBED_BATCH_WINDOW
+    )
+
+
+def check(response):
+    if response.status_code == 429 or response.status_code >= 500:
+        raise RuntimeError(f"Discord responded {response.status_code}")
+    if response.status_code >= 400:
+        raise PermanentFailure(f"Discord responded {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def batch_nonce(messages):
+    # A batch that is regrouped on retry must not reuse a nonce discord already accepted
+    if len(messages) == 1:
+        return messages[0].idempotency_key
+    keys = ",".join(sorted(message.idempotency_key for message in messages))
+    return hashlib.sha256(keys.encode()).hexdigest()[:25]
+
+
+def deliver(messages):
+    first = messages[0]
+    if first.kind == "DM":
+        member = Member.objects.get(id=first.recipient_id)
+        if not member.dm_channel:
+            channel_id = api_client.create_dm_channel(member.id)
+            if channel_id is None:
+                raise PermanentFailure("Could not open a DM channel.")
+            Member.objects.filter(id=member.id).update(dm_channel=channel_id)
+            member.dm_channel = channel_id
+        check(api_client.send_message(member.dm_channel, first.payload["content"], nonce=first.idempotency_key))
+    else:
+        check(api_client.send_embeds(
+            [message.payload["embed"] for message in messages], channel_id=first.recipient_id,
+            ping=first.payload.get("content"), nonce=batch_nonce(messages)
+        ))
+
+
+def claim(batch_size):
+    """
+    Leases due messages by pushing next_attempt_at forward, a crashed worker's lease simply expires.
+    Embeds still inside their batch window ride along with due embeds for the same channel.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = OutboxMessage.objects.select_for_update(skip_locked=True).filter(status="PENDING")
+        due = list(
+            pending.filter(next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id").values_list("id", "kind", "recipient_id")[:batch_size]
+        )
+        ids = [pk for pk, _, _ in due]
+        channels = {recipient_id for _, kind, recipient_id in due if kind == "EMBED"}
+        if channels:
+            ids += pending.filter(
+                kind="EMBED", recipient_id__in=channels, attempts=0,
+                next_attempt_at__gt=now, next_attempt_at__lte=now + EMBED_BATCH_WINDOW
+            ).order_by("id").values_list("id", flat=True)[:batch_size]
+        OutboxMessage.objects.filter(id__in=ids).update(next_attempt_at=now + CLAIM_TIMEOUT)
+    return list(OutboxMessage.objects.filter(id__in=ids).order_by("id"))
+
+
+def group(messages):
+    """
+    Splits claimed messages into sends: one per DM, embeds packed per channel and ping.
+    """
+    batches = [[message] for message in messages if message.kind == "DM"]
+    embeds = sorted(
+        (message for message in messages if message.kind == "EMBED"),
+        key=lambda message: (message.recipient_id, message.payload.get("content") or "", message.id)
+    )
+    for _, channel_embeds in groupby(embeds, key=lambda m: (m.recipient_id, m.payload.get("content") or "")):
+        batch, characters = [], 0
+        for message in channel_embeds:
+            size = len(json.dumps(message.payload["embed"]))
+            if batch and (len(batch) == MAX_EMBEDS or characters + size > MAX_EMBED_CHARACTERS):
+                batches.append(batch)
+                batch, characters = [], 0
+            batch.append(message)
+            characters += size
+        batches.append(batch)
+    return batches
+
+
+def process(messages):
+    close_old_connections()
+    ids = [message.id for message in messages]
+    attempts = max(message.attempts for message in messages) + 1
+    try:
+        deliver(messages)
+    except Exception as error:
+        failed = isinstance(error, PermanentFailure) or attempts >= MAX_ATTEMPTS
+        OutboxMessage.objects.filter(id__in=ids).update(
+            status="FAILED" if failed else "PENDING",
+            attempts=attempts,
+            last_error=str(error)[:1000],
+            next_attempt_at=timezone.now() + min(timedelta(seconds=2 ** attempts), MAX_BACKOFF),
+        )
+        return 0, len(messages)
+    else:
+        OutboxMessage.objects.filter(id__in=ids).update(status="SENT", attempts=attempts)
+        return len(messages), 0
+    finally:
+        close_old_connections()
+
+
+def drain(batch_size=50, concurrency=8):
+    """
+    Sends one batch of due messages concurrently, returns (sent, failed).
+    """
+    messages = claim(batch_size)
+    if not messages:
+        return 0, 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(process, group(messages)))
+    return sum(sent for sent, _ in results), sum(failed for _, failed in results)
@@ -0,0 +1,84 @@
+import re
+import time
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+FRESH_FRAGMENT = re.compile(rb"<!--fresh:(?P<template>[\w/.-]+)-->.*?<!--/fresh-->", re.S)
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def tag_key(tag):
+    return f"page-tag:{tag}"
+
+
+def get_tag_versions(tags):
+    cache = get_cache()
+    keys = [tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*tags):
+    """
+    Bumping a tag version orphans every cached page rendered with it,
+    the stale entries simply expire from the backend.
+    """
+    get_cache().set_many({tag_key(tag): time.time_ns() for tag in tags}, None)
+
+
+def page_key(request, tags):
+    raw = f"{request.get_host()}{request.get_full_path()}:{get_tag_versions(tags)}"
+    return f"page:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serves GET requests of logged out users from the page cache.
+    cache_tags are formatted with the url kwargs, eg: "bot:{bot_id}".
+    fresh_fragments are templates the page wraps in <!--fresh:template-->...<!--/fresh-->, they are
+    rendered again with get_fresh_context() whenever the page comes from the cache, eg: random picks.
+    """
+    cache_tags = ()
+    fresh_fragments = ()
+
+    def get_fresh_context(self):
+        return {}
+
+    def refresh_fragments(self, request, response):
+        context = self.get_fresh_context()
+
+        def render_fragment(match):
+            template = match["template"].decode()
+            if template not in self.fresh_fragments:
+                return match[0]
+            html = render_to_string(template, context, request).encode(response.charset)
+            return b"<!--fresh:" + match["template"] + b"-->" + html + b"<!--/fresh-->"
+
+        response.content = FRESH_FRAGMENT.sub(render_fragment, response.content)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_key(request, [tag.format(**kwargs) for tag in self.cache_tags])
+        response = get_cache().get(key)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                if hasattr(response, "render"):
+                    response.render()
+                get_cache().set(key, response, settings.PAGE_CACHE_TIMEOUT)
+        elif self.fresh_fragments:
+            response = self.refresh_fragments(request, response)
+        return response
@@ -0,0 +1,142 @@
+import json
+import math
+import base64
+
+from django.db.models import Q
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Cursors come from the url, anything the database columns can't hold is treated as no cursor
+MAX_BIGINT = 2 ** 63 - 1
+
+
+class KeysetPage:
+    """
+    Drop-in replacement for django's Page used by the list templates.
+    next_page_number/previous_page_number return opaque cursors instead of numbers
+    so the existing "?page=" links keep working.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+
+class KeysetPaginator:
+    """
+    Cursor based paginator ordered on (key, pk). Every page is a single indexed range scan
+    of per_page + 1 rows, no COUNT(*) and no OFFSET, so deep pages cost the same as the first.
+    """
+
+    def __init__(self, queryset, per_page, key="votes", descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key = key
+        self.descending = descending
+        try:
+            self.key_field = queryset.model._meta.get_field(key)
+        except FieldDoesNotExist:
+            # Annotations like search_rank, the cursor keeps their json value as is
+            self.key_field = None
+
+    def encode_cursor(self, direction, obj):
+        payload = json.dumps([direction, getattr(obj, self.key), obj.pk], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """
+        (direction, key value, pk), None for a cursor that is malformed or out of range.
+        """
+        try:
+            cursor += "=" * (-len(cursor) % 4)
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if direction not in ("after", "before") or value is None:
+                return None
+            value = float(value) if self.key_field is None else self.key_field.to_python(value)
+            pk = int(pk)
+        except (ValueError, TypeError, OverflowError, UnicodeDecodeError, ValidationError):
+            return None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if isinstance(value, int) and not -MAX_BIGINT <= value <= MAX_BIGINT:
+            return None
+        if not -MAX_BIGINT <= pk <= MAX_BIGINT:
+            return None
+        return direction, value, pk
+
+    def ordering(self, reverse=False):
+        prefix = "-" if self.descending != reverse else ""
+        return f"{prefix}{self.key}", f"{prefix}pk"
+
+    def seek(self, value, pk, forward):
+        lookup = "lt" if self.descending == forward else "gt"
+        return Q(**{f"{self.key}__{lookup}": value}) | Q(**{self.key: value, f"pk__{lookup}": pk})
+
+    def page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self.ordering())[:self.per_page + 1])
+            has_next, has_previous = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        elif decoded[0] == "after":
+            rows = list(
+                self.queryset.filter(self.seek(decoded[1], decoded[2], forward=True))
+                .order_by(*self.ordering())[:self.per_page + 1]
+            )
+            has_next, has_previous = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+        else:
+            rows = list(
+                self.queryset.filter(self.seek(decoded[1], decoded[2], forward=False))
+                .order_by(*self.ordering(reverse=True))[:self.per_page + 1]
+            )
+            has_next, has_previous = True, len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+
+        return KeysetPage(
+            rows, self,
+            next_cursor=self.encode_cursor("after", rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor("before", rows[0]) if rows and has_previous else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin swapping django's offset paginator for KeysetPaginator.
+    """
+    keyset_key = "votes"
+    keyset_descending = True
+
+    def get_keyset_key(self):
+        return self.keyset_key
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, key=self.get_keyset_key(), descending=self.keyset_descending)
+        page = paginator.page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
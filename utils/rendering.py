@@ -0,0 +1,55 @@
+import re
+import html
+import hashlib
+from functools import lru_cache
+
+import markdown as md
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AMP_SUBSTITUTE
+
+SAFE_URL_SCHEMES = ("", "http", "https", "mailto")
+# Browsers drop these anywhere in a url before reading its scheme, eg: "java\tscript:"
+IGNORED_URL_CHARACTERS = re.compile(r"[\x00-\x20\x7f-\x9f]")
+# Part of every content hash, bump it when the sanitizer changes so stored renders stop matching
+RENDERER_VERSION = "2"
+
+
+def url_scheme(url):
+    """
+    The scheme a browser would see: markdown keeps entities as written (with its own & marker)
+    and the browser decodes them, so "jav&#x61;script:" must be read as "javascript:".
+    """
+    url = IGNORED_URL_CHARACTERS.sub("", html.unescape(url.replace(AMP_SUBSTITUTE, "&")))
+    # Stricter than urlparse, which gives no scheme when it holds a character a scheme can't
+    head = re.split(r"[/?#]", url, maxsplit=1)[0]
+    return head.partition(":")[0].lower() if ":" in head else ""
+
+
+class SafeLinksTreeprocessor(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url is not None and url_scheme(url) not in SAFE_URL_SCHEMES:
+                    element.set(attribute, "#")
+
+
+class SanitizeExtension(Extension):
+    """
+    Escapes raw html instead of passing it through and neutralizes javascript: style links.
+    """
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(SafeLinksTreeprocessor(md), "safe_links", 0)
+
+
+def content_hash(text):
+    return hashlib.sha256(f"{RENDERER_VERSION}:{text or ''}".encode()).hexdigest()
+
+
+@lru_cache(maxsize=512)
+def render_markdown(text):
+    return md.markdown(text or "", extensions=["markdown.extensions.fenced_code", SanitizeExtension()])
@@ -0,0 +1,73 @@
+import random
+import threading
+import time
+
+from main_site.models import Bot, Server
+
+
+class ListingSampler:
+    """
+    Keeps the ids of listed bots/servers in a flat in-process list so random picks are O(k)
+    instead of ORDER BY RANDOM() over the whole table. Updated incrementally from the post_save
+    receivers and fully reloaded every `ttl` seconds to pick up changes made by other workers.
+    """
+
+    def __init__(self, model, ttl=600):
+        self.model = model
+        self.ttl = ttl
+        self.ids = []
+        self.positions = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        ids = list(self.model.objects.listed().values_list("id", flat=True))
+        with self.lock:
+            self.ids = ids
+            self.positions = {pk: index for index, pk in enumerate(ids)}
+            self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    def ensure_loaded(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl:
+            self.load()
+
+    def add(self, pk):
+        with self.lock:
+            if pk not in self.positions:
+                self.positions[pk] = len(self.ids)
+                self.ids.append(pk)
+
+    def discard(self, pk):
+        with self.lock:
+            index = self.positions.pop(pk, None)
+            if index is None:
+                return
+            last = self.ids.pop()
+            if index < len(self.ids):
+                self.ids[index] = last
+                self.positions[last] = index
+
+    def update(self, instance):
+        if self.loaded_at is None:
+            return
+        if instance.is_listed:
+            self.add(instance.pk)
+        else:
+            self.discard(instance.pk)
+
+    def sample(self, count):
+        self.ensure_loaded()
+        with self.lock:
+            return random.sample(self.ids, min(count, len(self.ids)))
+
+    def get_random(self, count=8):
+        ids = self.sample(count)
+        objects = self.model.objects.listed().for_cards().in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+bot_sampler = ListingSampler(Bot)
+server_sampler = ListingSampler(Server)
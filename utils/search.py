@@ -0,0 +1,150 @@
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, TextField, Value, When
+from django.db.models.functions import Coalesce, Ln
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+from main_site.models import Bot, BotMeta, Server, ServerMeta
+
+TOKEN_RE = re.compile(r"\w+")
+SEARCH_CONFIG = "english"
+# Same relative weights postgres uses for the A, B and C labels
+FIELD_WEIGHTS = (("name", "A", 1.0), ("short_desc", "B", 0.4), ("long_desc", "C", 0.2))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def popularity(score):
+    """
+    Text relevance blended with votes so equally relevant listings are ordered by popularity.
+    """
+    return score * Ln(Value(2.0) + F("votes"))
+
+
+class PostgresSearchBackend:
+    """
+    Weighted tsvector column kept up to date with one UPDATE per save, queried through its GIN index.
+    """
+
+    def __init__(self, model, meta_model):
+        self.model = model
+        self.meta_model = meta_model
+        self.fk_field = model._meta.model_name
+
+    def vector(self):
+        long_desc = Subquery(
+            self.meta_model.objects.filter(**{self.fk_field: OuterRef("pk")}).values("long_desc")[:1]
+        )
+        fields = {"name": F("name"), "short_desc": F("short_desc"), "long_desc": long_desc}
+        vector = None
+        for field, label, _ in FIELD_WEIGHTS:
+            # name/short_desc are varchar and long_desc is text, coalesce them all as text
+            text = Coalesce(fields[field], Value(""), output_field=TextField())
+            part = SearchVector(text, weight=label, config=SEARCH_CONFIG)
+            vector = part if vector is None else vector + part
+        return vector
+
+    def index(self, pk):
+        self.model.objects.filter(pk=pk).update(search_vector=self.vector())
+
+    def rebuild(self):
+        self.model.objects.update(search_vector=self.vector())
+
+    def search(self, queryset, query):
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=popularity(SearchRank(F("search_vector"), search_query))
+        )
+
+
+class InvertedIndexBackend:
+    """
+    Pure python inverted index used on databases without full text search (local sqlite setups).
+    Built lazily from the listed rows, updated from the save signals and reloaded every `ttl`
+    seconds to pick up writes made by other processes.
+    """
+
+    def __init__(self, model, meta_model, ttl=600, limit=1000):
+        self.model = model
+        self.meta_model = meta_model
+        self.ttl = ttl
+        self.limit = limit
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def rows(self, **filters):
+        return self.model.objects.listed().filter(**filters).values_list("id", "name", "short_desc", "meta__long_desc")
+
+    def add(self, pk, *texts):
+        self.discard(pk)
+        weights = defaultdict(float)
+        for text, (_, _, weight) in zip(texts, FIELD_WEIGHTS):
+            for token in tokenize(text):
+                weights[token] += weight
+        for token, weight in weights.items():
+            self.postings[token][pk] = weight
+        self.documents[pk] = tuple(weights)
+
+    def discard(self, pk):
+        for token in self.documents.pop(pk, ()):
+            self.postings[token].pop(pk, None)
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def rebuild(self):
+        with self.lock:
+            self.postings, self.documents = defaultdict(dict), {}
+            for row in self.rows().iterator():
+                self.add(*row)
+            self.loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl:
+            self.rebuild()
+
+    def index(self, pk):
+        if self.loaded_at is None:
+            return
+        row = self.rows(pk=pk).first()
+        with self.lock:
+            if row is None:
+                self.discard(pk)
+            else:
+                self.add(*row)
+
+    def scores(self, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+        self.ensure_loaded()
+        with self.lock:
+            postings = sorted((self.postings.get(token, {}) for token in set(tokens)), key=len)
+            scores = dict(postings[0])
+            for posting in postings[1:]:
+                scores = {pk: score + posting[pk] for pk, score in scores.items() if pk in posting}
+        return scores
+
+    def search(self, queryset, query):
+        scores = sorted(self.scores(query).items(), key=lambda item: item[1], reverse=True)[:self.limit]
+        if not scores:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        rank = Case(*[When(pk=pk, then=Value(score)) for pk, score in scores], output_field=FloatField())
+        return queryset.filter(pk__in=[pk for pk, _ in scores]).annotate(search_rank=popularity(rank))
+
+
+def get_search_backend(model, meta_model):
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend(model, meta_model)
+    return InvertedIndexBackend(model, meta_model)
+
+
+bot_search = get_search_backend(Bot, BotMeta)
+server_search = get_search_backend(Server, ServerMeta)
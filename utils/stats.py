@@ -0,0 +1,188 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from main_site.models import Bot, BotMeta, BotShard
+
+logger = logging.getLogger(__name__)
+
+
+class StatsBuffer:
+    """
+    Collects server/shard counts posted by bots and writes them every `interval` seconds with one
+    bulk UPDATE of server_count and one UPDATE per distinct shard_count, bypassing save() and
+    its signals. Posts for the same bot inside an interval collapse into one write and values
+    equal to the last ones written are skipped. When the database rejects the batch the bots are
+    written one by one and the ones it still rejects are dropped, anything else re-queues the batch.
+    Per shard counts are upserted into BotShard and summed in SQL, so every worker process sees the
+    shards posted to the others and the total is the same whichever worker sums it.
+    """
+
+    def __init__(self, interval=10, shard_timeout=3600):
+        self.interval = interval
+        self.shard_timeout = shard_timeout
+        self.pending = {}
+        self.written = {}
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    @staticmethod
+    def merge(update, newer):
+        shards = {**update.get("shards", {}), **newer.get("shards", {})}
+        update.update(newer)
+        if shards:
+            update["shards"] = shards
+        return update
+
+    def submit(self, stats):
+        """
+        stats: dicts of bot_id, server_count and optionally shard_id/shard_count, already validated.
+        A post with a shard_id carries that shard's server_count, the bot total is the sum of its shards.
+        """
+        updates = {}
+        for entry in stats:
+            update = updates.setdefault(entry["bot_id"], {})
+            if entry.get("shard_count") is not None:
+                update["shard_count"] = entry["shard_count"]
+            if entry.get("server_count") is None:
+                continue
+            if entry.get("shard_id") is None:
+                update["server_count"] = entry["server_count"]
+            else:
+                update.setdefault("shards", {})[entry["shard_id"]] = entry["server_count"]
+        with self.lock:
+            for bot_id, update in updates.items():
+                self.merge(self.pending.setdefault(bot_id, {}), update)
+            if self.flusher is None:
+                self.start()
+
+    def start(self):
+        self.flusher = threading.Thread(target=self.run, name="bot-stats-flusher", daemon=True)
+        self.flusher.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        event = threading.Event()
+        while not event.wait(self.interval):
+            # The flusher owns its connection, drop it when it outlived CONN_MAX_AGE or broke
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing bot stats failed")
+            finally:
+                close_old_connections()
+
+    @staticmethod
+    def write_shards(pending):
+        now = timezone.now()
+        shards = [
+            BotShard(bot_id=pk, shard_id=shard_id, server_count=server_count, updated=now)
+            for pk, update in sorted(pending.items())
+            for shard_id, server_count in sorted(update.get("shards", {}).items())
+        ]
+        if shards:
+            BotShard.objects.bulk_create(
+                shards, batch_size=500, update_conflicts=True, unique_fields=["bot", "shard_id"],
+                update_fields=["server_count", "updated"]
+            )
+
+    def shard_totals(self, pending):
+        sharded = [pk for pk, update in pending.items() if "shards" in update]
+        if not sharded:
+            return {}
+        known = dict(BotMeta.objects.filter(
+            bot_id__in=[pk for pk in sharded if "shard_count" not in pending[pk]]
+        ).values_list("bot_id", "shard_count"))
+        by_shard_count = defaultdict(list)
+        for pk in sharded:
+            by_shard_count[pending[pk].get("shard_count", known.get(pk)) or 1].append(pk)
+        # Shards past the current shard_count or not posted within shard_timeout are left out
+        current = Q()
+        for shard_count, pks in by_shard_count.items():
+            current |= Q(bot_id__in=pks, shard_id__lt=shard_count)
+        totals = dict(
+            BotShard.objects.filter(current, updated__gte=timezone.now() - timedelta(seconds=self.shard_timeout))
+            .values("bot_id").annotate(total=Sum("server_count")).values_list("bot_id", "total")
+        )
+        return {pk: totals.get(pk, 0) for pk in sharded}
+
+    def requeue(self, pending):
+        with self.lock:
+            for pk, update in pending.items():
+                self.pending[pk] = self.merge(update, self.pending.get(pk, {}))
+
+    @staticmethod
+    def write(changes):
+        """
+        changes: bot id to the server_count and/or shard_count to write.
+        """
+        server_counts, shard_counts = [], defaultdict(list)
+        for pk, change in sorted(changes.items()):
+            if "server_count" in change:
+                server_counts.append(Bot(id=pk, server_count=change["server_count"]))
+            if "shard_count" in change:
+                shard_counts[change["shard_count"]].append(pk)
+        with transaction.atomic():
+            if server_counts:
+                Bot.objects.bulk_update(server_counts, ["server_count"], batch_size=500)
+            for shard_count, pks in shard_counts.items():
+                BotMeta.objects.filter(bot_id__in=pks).update(shard_count=shard_count)
+
+    def write_each(self, pending, changes):
+        """
+        One bad row fails the whole batch, so retry bot by bot and drop the rows the database
+        still rejects. Any other error re-queues the bots not written yet.
+        """
+        pks = sorted(changes)
+        for index, pk in enumerate(pks):
+            try:
+                self.write({pk: changes[pk]})
+            except (DataError, IntegrityError):
+                logger.exception("Dropping stats of bot %s: %s", pk, changes[pk])
+                del pending[pk]
+            except Exception:
+                self.requeue({rest: pending.pop(rest) for rest in pks[index:]})
+                raise
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            self.write_shards(pending)
+            for pk, total in self.shard_totals(pending).items():
+                pending[pk]["server_count"] = total
+        except Exception:
+            self.requeue(pending)
+            raise
+        changes = {}
+        for pk, update in pending.items():
+            written = self.written.get(pk, {})
+            change = {
+                field: update[field] for field in ("server_count", "shard_count")
+                if field in update and update[field] != written.get(field)
+            }
+            if change:
+                changes[pk] = change
+        try:
+            if changes:
+                self.write(changes)
+        except (DataError, IntegrityError):
+            self.write_each(pending, changes)
+        except Exception:
+            self.requeue(pending)
+            raise
+        for pk, update in pending.items():
+            self.written.setdefault(pk, {}).update(
+                (field, update[field]) for field in ("server_count", "shard_count") if field in update
+            )
+
+bot_stats = StatsBuffer()
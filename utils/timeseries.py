@@ -0,0 +1,152 @@
+import sys
+import time
+from array import array
+from itertools import islice
+
+from main_site.models import Bot, Server, StatSeries
+
+# name: (step in seconds, capacity), a series costs 4 bytes per slot whatever its age
+RESOLUTIONS = {
+    "5m": (300, 288),
+    "1h": (3600, 720),
+    "1d": (86400, 730),
+}
+MISSING = -1
+
+
+class Ring:
+    """
+    Last value per bucket for the `capacity` most recent buckets. Values are gauges, a bucket
+    that was never written holds the value of the bucket before it.
+    """
+
+    def __init__(self, step, capacity, values=None, last_bucket=None):
+        self.step = step
+        self.capacity = capacity
+        self.values = values if values is not None else array("i", [MISSING]) * capacity
+        self.last_bucket = last_bucket
+
+    @classmethod
+    def load(cls, resolution, row=None):
+        step, capacity = RESOLUTIONS[resolution]
+        if row is None:
+            return cls(step, capacity)
+        values = array("i")
+        values.frombytes(bytes(row.values))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls(step, capacity, values, row.last_bucket)
+
+    def dump(self):
+        values = array("i", self.values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values.tobytes()
+
+    def last(self):
+        return MISSING if self.last_bucket is None else self.values[self.last_bucket % self.capacity]
+
+    def set(self, timestamp, value):
+        """
+        Returns False when the sample changes nothing, unchanged gauges are never rewritten.
+        """
+        bucket = int(timestamp) // self.step
+        last = self.last()
+        if self.last_bucket is not None:
+            if bucket < self.last_bucket or value == last:
+                return False
+            for skipped in range(max(self.last_bucket + 1, bucket - self.capacity + 1), bucket):
+                self.values[skipped % self.capacity] = last
+        self.values[bucket % self.capacity] = value
+        self.last_bucket = bucket
+        return True
+
+    def points(self, timestamp):
+        if self.last_bucket is None:
+            return []
+        end = max(int(timestamp) // self.step, self.last_bucket)
+        points = []
+        for bucket in range(end - self.capacity + 1, end + 1):
+            if bucket > self.last_bucket:
+                value = self.last()
+            elif bucket > self.last_bucket - self.capacity:
+                value = self.values[bucket % self.capacity]
+            else:
+                continue
+            if value != MISSING:
+                points.append([bucket * self.step, value])
+        return points
+
+
+class TimeSeriesStore:
+    """
+    History of the count fields of bots/servers, one StatSeries row per metric and resolution.
+    Each resolution keeps the last value of its buckets, so the hourly and daily rings are the
+    downsampled history of the same samples. Storage is capped at sum(capacity) * 4 bytes per
+    entity and metric, and a sample that doesn't change a value writes nothing.
+    """
+
+    def __init__(self, content, model, fields, chunk_size=1000):
+        self.content = content
+        self.model = model
+        self.fields = fields
+        self.chunk_size = chunk_size
+
+    def record(self, metric, samples, timestamp=None):
+        """
+        samples: {pk: value}. Returns the number of rows written.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        samples = {pk: int(value) for pk, value in samples.items() if value is not None}
+        rows = {
+            (row.object_id, row.resolution): row
+            for row in StatSeries.objects.filter(content=self.content, metric=metric, object_id__in=samples)
+        }
+        created, updated = [], []
+        for pk, value in samples.items():
+            for resolution in RESOLUTIONS:
+                row = rows.get((pk, resolution))
+                ring = Ring.load(resolution, row)
+                if not ring.set(timestamp, value):
+                    continue
+                if row is None:
+                    created.append(StatSeries(
+                        content=self.content, object_id=pk, metric=metric, resolution=resolution,
+                        last_bucket=ring.last_bucket, values=ring.dump()
+                    ))
+                else:
+                    row.last_bucket, row.values = ring.last_bucket, ring.dump()
+                    updated.append(row)
+        StatSeries.objects.bulk_create(created, ignore_conflicts=True)
+        StatSeries.objects.bulk_update(updated, ["last_bucket", "values"], batch_size=500)
+        return len(created) + len(updated)
+
+    def snapshot(self, timestamp=None):
+        """
+        Samples the current value of every metric of every entity, chunk by chunk.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        metrics = list(self.fields)
+        rows = self.model.objects.values_list("id", *self.fields.values()).iterator(chunk_size=self.chunk_size)
+        written = 0
+        while chunk := list(islice(rows, self.chunk_size)):
+            for index, metric in enumerate(metrics, start=1):
+                written += self.record(metric, {row[0]: row[index] for row in chunk}, timestamp)
+        return written
+
+    def series(self, pk, metric, resolution="1h", timestamp=None):
+        row = StatSeries.objects.filter(
+            content=self.content, object_id=pk, metric=metric, resolution=resolution
+        ).first()
+        if row is None:
+            return []
+        return Ring.load(resolution, row).points(time.time() if timestamp is None else timestamp)
+
+    def forget(self, pk):
+        StatSeries.objects.filter(content=self.content, object_id=pk).delete()
+
+
+bot_series = TimeSeriesStore("bot", Bot, {"server_count": "server_count", "shard_count": "meta__shard_count"})
+server_series = TimeSeriesStore(
+    "server", Server, {"members_online": "members_online", "member_count": "meta__member_count"}
+)
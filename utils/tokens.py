@@ -0,0 +1,38 @@
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from main_site.models import Member
+
+
+def expiring(within, exclude=()):
+    return Member.objects.select_related("meta").filter(
+        meta__access_token__isnull=False, meta__refresh_token__isnull=False,
+        meta__access_token_expiry__lte=timezone.now() + within
+    ).exclude(id__in=exclude).order_by("meta__access_token_expiry")
+
+
+def refresh(member):
+    close_old_connections()
+    try:
+        return member.refresh_access_token()
+    except Exception:
+        # Network errors, 5xx html bodies; the member is picked up again on the next run
+        return False
+    finally:
+        close_old_connections()
+
+
+def refresh_expiring(within=timedelta(days=1), batch_size=100, concurrency=8, exclude=()):
+    """
+    Refreshes the OAuth tokens expiring inside `within`, soonest first, skipping the member ids in
+    `exclude`. Returns (refreshed, failed ids).
+    """
+    members = list(expiring(within, exclude)[:batch_size])
+    if not members:
+        return 0, []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(refresh, members))
+    return results.count(True), [member.id for member, result in zip(members, results) if not result]
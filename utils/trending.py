@@ -0,0 +1,44 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+
+# Scores are log(sum(2 ** (age_of_vote_at_epoch / half_life))). Every vote's weight keeps its
+# value relative to the others as time passes, so ordering by the stored score is the decayed
+# ranking at any moment and no row ever needs rewriting when the clock moves.
+TRENDING_EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+TRENDING_HALF_LIFE = timedelta(hours=24)
+DECAY_RATE = math.log(2) / TRENDING_HALF_LIFE.total_seconds()
+# exp() below this is 0 in double precision anyway; postgres raises "value out of range: underflow"
+# instead of returning 0, which is what the first vote on a row still at 0 would hit.
+EXP_FLOOR = -700.0
+
+
+def vote_weight(when):
+    return DECAY_RATE * (when - TRENDING_EPOCH).total_seconds()
+
+
+def add_vote(when, field="trending"):
+    """
+    Update expression adding one vote at `when` to a log-space score:
+    logaddexp(a, b) = max(a, b) + ln(1 + exp(-|a - b|))
+    """
+    weight = Value(vote_weight(when))
+    gap = Greatest(Value(0.0) - Abs(F(field) - weight), Value(EXP_FLOOR))
+    return Greatest(F(field), weight) + Ln(Value(1.0) + Exp(gap))
+
+
+def logsumexp(weights):
+    if not weights:
+        return 0.0
+    peak = max(weights)
+    return peak + math.log(sum(math.exp(weight - peak) for weight in weights))
+
+
+def decayed_score(score, now=None):
+    """
+    Turns a stored score into the present-day decayed vote count, mostly for display and debugging.
+    """
+    now = now or datetime.now(timezone.utc)
+    return math.exp(score - vote_weight(now)) if score else 0.0
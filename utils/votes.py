@@ -0,0 +1,135 @@
+import math
+from datetime import datetime, time, timedelta
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from main_site.models import Bot, BotVote, BotVoteDaily, Member, Server, ServerVote, ServerVoteDaily
+from utils import outbox, page_cache, trending
+from utils.facets import bot_facets, server_facets
+
+
+class AlreadyVoted(Exception):
+    pass
+
+
+class VoteLedger:
+    """
+    Records a vote and bumps the denormalized vote counter in one transaction.
+    The member row is locked for the duration so one member can't double vote from
+    parallel requests, while votes from different members never wait on each other
+    beyond the single row UPDATE of the counter.
+    """
+
+    def __init__(self, model, vote_model, rollup_model, facets, cooldown=timedelta(hours=12)):
+        self.model = model
+        self.vote_model = vote_model
+        self.rollup_model = rollup_model
+        self.facets = facets
+        self.fk_field = model._meta.model_name
+        self.cooldown = cooldown
+
+    def has_voted(self, member, target_id, now=None):
+        now = now or timezone.now()
+        return self.vote_model.objects.filter(**{
+            "member": member, self.fk_field: target_id, "creation_time__gt": now - self.cooldown
+        }).exists()
+
+    def cast(self, member, target_id):
+        """
+        Returns the target with its updated vote count.
+        Raises AlreadyVoted inside the cooldown and model.DoesNotExist for unlisted targets.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            Member.objects.select_for_update().only("id").get(id=member.id)
+            if self.has_voted(member, target_id, now):
+                raise AlreadyVoted
+            updated = self.model.objects.listed().filter(id=target_id).update(
+                votes=F("votes") + 1, trending=trending.add_vote(now)
+            )
+            if not updated:
+                raise self.model.DoesNotExist
+            self.vote_model.objects.create(member=member, creation_time=now, **{f"{self.fk_field}_id": target_id})
+            target = self.model.objects.select_related("owner").get(id=target_id)
+            outbox.embed(target.vote_embed(member))
+            transaction.on_commit(lambda: self.facets.on_vote(target))
+        page_cache.invalidate(f"{self.fk_field}:{target_id}")
+        return target
+
+    def compact_batch(self, before, batch_size=1000):
+        """
+        Folds up to batch_size raw votes older than `before` into the daily rollup table
+        and deletes them. Returns the number of raw votes compacted.
+        """
+        with transaction.atomic():
+            ids = list(
+                self.vote_model.objects.filter(creation_time__lt=before, **{f"{self.fk_field}__isnull": False})
+                .order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return 0
+            counts = (
+                self.vote_model.objects.filter(id__in=ids)
+                .annotate(day=TruncDate("creation_time")).values(f"{self.fk_field}_id", "day")
+                .annotate(total=Count("id")).order_by()
+            )
+            for row in counts:
+                rollup, created = self.rollup_model.objects.get_or_create(
+                    **{f"{self.fk_field}_id": row[f"{self.fk_field}_id"], "day": row["day"]},
+                    defaults={"votes": row["total"]}
+                )
+                if not created:
+                    self.rollup_model.objects.filter(pk=rollup.pk).update(votes=F("votes") + row["total"])
+            self.vote_model.objects.filter(id__in=ids).delete()
+        return len(ids)
+
+    def votes_since(self, since):
+        """
+        Votes per bot/server since `since`, reading whole days from the rollups and
+        anything newer than the last compacted day from the raw ledger.
+        """
+        day = since.date()
+        totals = Counter(dict(
+            self.rollup_model.objects.filter(day__gte=day).values(f"{self.fk_field}_id")
+            .annotate(total=Sum("votes")).order_by().values_list(f"{self.fk_field}_id", "total")
+        ))
+        totals.update(dict(
+            self.vote_model.objects.filter(creation_time__gte=since).values(f"{self.fk_field}_id")
+            .annotate(total=Count("id")).order_by().values_list(f"{self.fk_field}_id", "total")
+        ))
+        totals.pop(None, None)
+        return totals
+
+    def rebuild_trending(self, batch_size=1000):
+        """
+        Recomputes every trending score from the vote ledger and the daily rollups,
+        wiping out float drift and scores of entities whose votes were deleted.
+        """
+        weights = defaultdict(list)
+        votes = self.vote_model.objects.filter(**{f"{self.fk_field}__isnull": False, "creation_time__isnull": False})
+        for pk, creation_time in votes.values_list(f"{self.fk_field}_id", "creation_time").iterator():
+            weights[pk].append(trending.vote_weight(creation_time))
+        for pk, day, count in self.rollup_model.objects.values_list(f"{self.fk_field}_id", "day", "votes").iterator():
+            midday = datetime.combine(day, time(12, tzinfo=trending.TRENDING_EPOCH.tzinfo))
+            weights[pk].append(trending.vote_weight(midday) + math.log(count))
+
+        with transaction.atomic():
+            self.model.objects.exclude(id__in=list(weights)).exclude(trending=0).update(trending=0)
+            targets = list(self.model.objects.filter(id__in=list(weights)).only("id", "trending"))
+            for target in targets:
+                target.trending = trending.logsumexp(weights[target.id])
+            self.model.objects.bulk_update(targets, ["trending"], batch_size=batch_size)
+        return len(weights)
+
+    def leaderboard(self, since, limit=10):
+        ids = [pk for pk, _ in self.votes_since(since).most_common()]
+        listed = set(self.model.objects.listed().filter(id__in=ids).values_list("id", flat=True))
+        return [pk for pk in ids if pk in listed][:limit]
+
+
+bot_votes = VoteLedger(Bot, BotVote, BotVoteDaily, bot_facets)
+server_votes = VoteLedger(Server, ServerVote, ServerVoteDaily, server_facets)